@@ -1,9 +1,15 @@
 from fastapi import APIRouter
-from .v1 import events, heatmap, webhooks
-from app.demo import demo
+from .v1 import analytics, bulk, events, heatmap, sims, webhooks
+from app.core.config import DEMO_ENABLED
 
 api = APIRouter()
 api.include_router(webhooks.router)
 api.include_router(events.router)
 api.include_router(heatmap.router)
-api.include_router(demo.router)
+api.include_router(sims.router)
+api.include_router(analytics.router)
+api.include_router(bulk.router)
+if DEMO_ENABLED:
+    from app.demo import demo
+
+    api.include_router(demo.router)
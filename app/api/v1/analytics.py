@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+from typing_extensions import Literal
+
+from fastapi import APIRouter, Depends
+from sqlmodel import Session
+
+from app.core.db import get_session
+from app.repositories.cells_repo import CellsRepository
+from app.repositories.sessions_repo import SessionsRepository
+from app.repositories.sketches_repo import TILE_DEGREES, SketchesRepository
+from app.schemas.analytics import (
+    CellEntry,
+    CellsResponse,
+    DistinctSimsResponse,
+    UsageEntry,
+    UsageResponse,
+)
+
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+@router.get("/usage", response_model=UsageResponse)
+def usage(
+    group_by: Literal["sim", "network"] = "sim",
+    limit: int = 10,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    session: Session = Depends(get_session),
+) -> UsageResponse:
+    repo = SessionsRepository(session)
+    rows = repo.top_usage(group_by, limit, start_time, end_time)
+    items = []
+    for row in rows:
+        *keys, total, upload, download, count = row
+        if group_by == "network":
+            mcc, mnc, name = keys
+            entry = UsageEntry(network_mcc=mcc, network_mnc=mnc, network_name=name)
+        else:
+            iccid, name = keys
+            entry = UsageEntry(sim_iccid=iccid, sim_unique_name=name)
+        entry.data_total = total or 0
+        entry.data_upload = upload or 0
+        entry.data_download = download or 0
+        entry.sessions = count or 0
+        items.append(entry)
+    return UsageResponse(group_by=group_by, items=items)
+
+
+@router.get("/cells", response_model=CellsResponse)
+def cells(
+    metric: Literal["ended", "started", "updated", "events", "bytes"] = "ended",
+    limit: int = 10,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    session: Session = Depends(get_session),
+) -> CellsResponse:
+    """Top cells by ``metric`` over whole-hour buckets in the window."""
+    repo = CellsRepository(session)
+    rows, first, last = repo.top_cells(metric, limit, start_time, end_time)
+    hours = int((last - first).total_seconds() // 3600) + 1 if first and last else 0
+    items = []
+    for r in rows:
+        positions = r["positions"] or 0
+        items.append(
+            CellEntry(
+                network_mcc=r["network_mcc"],
+                network_mnc=r["network_mnc"],
+                lac=r["lac"],
+                cell_id=r["cell_id"],
+                started=r["started"] or 0,
+                updated=r["updated"] or 0,
+                ended=r["ended"] or 0,
+                events=r["events"] or 0,
+                data_total=r["data_total"] or 0,
+                ended_per_hour=(r["ended"] or 0) / hours if hours else 0.0,
+                last_seen=r["last_seen"],
+                lat=r["lat_sum"] / positions if positions else None,
+                lon=r["lon_sum"] / positions if positions else None,
+            )
+        )
+    return CellsResponse(metric=metric, hours=max(hours, 0), items=items)
+
+
+@router.get("/distinct-sims", response_model=DistinctSimsResponse)
+def distinct_sims(
+    min_lat: float = -90.0,
+    min_lon: float = -180.0,
+    max_lat: float = 90.0,
+    max_lon: float = 180.0,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    session: Session = Depends(get_session),
+) -> DistinctSimsResponse:
+    """Approximate distinct ICCIDs seen in a bbox/window from HyperLogLog sketches.
+
+    The bbox is widened to whole tiles and the window to whole hours.
+    ``lower``/``upper`` bracket the estimate at three standard errors (~99.7%).
+    """
+    repo = SketchesRepository(session)
+    merged, count = repo.estimate(min_lat, min_lon, max_lat, max_lon, start_time, end_time)
+    estimate = merged.estimate() if count else 0.0
+    margin = 3 * merged.relative_error * estimate
+    return DistinctSimsResponse(
+        estimate=round(estimate),
+        relative_error=merged.relative_error,
+        lower=max(0, round(estimate - margin)),
+        upper=round(estimate + margin),
+        sketches=count,
+        tile_degrees=TILE_DEGREES,
+    )
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import tempfile
+from datetime import datetime
+from typing import Optional
+from typing_extensions import Literal
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import StatementError
+
+from app.core.db import engine
+
+
+router = APIRouter(tags=["bulk"])
+
+
+@router.get("/export")
+def export_events(
+    format: Literal["csv", "ndjson", "parquet"] = "csv",
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    include_payload: bool = False,
+) -> StreamingResponse:
+    """Stream events in a columnar/line format straight off a DB cursor.
+
+    The generator owns its own connection: request-scoped sessions are closed
+    before a streaming body is sent.
+    """
+    # Export/import services load on first use, off the cold-start path
+    from app.services.export_service import MEDIA_TYPES, ExportService, parquet_available
+
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow")
+    svc = ExportService(engine)
+    body = svc.stream(format, start_time, end_time, include_payload)
+    filename = f"connectionevents.{format}"
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/import")
+async def import_events(
+    request: Request,
+    format: Literal["ndjson", "parquet"] = "ndjson",
+    batch_size: int = 50_000,
+) -> dict:
+    """Bulk-load an NDJSON or Parquet archive sent as the raw request body."""
+    from app.services.export_service import parquet_available
+    from app.services.import_service import BulkImporter
+
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet import requires pyarrow")
+    # Spool to disk: Parquet needs a seekable file and archives can be large
+    spool = tempfile.SpooledTemporaryFile(max_size=64 * 1024 * 1024)
+    try:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        importer = BulkImporter(engine, batch_size=batch_size)
+        try:
+            stored = await run_in_threadpool(importer.load_file, spool, format)
+        except (ValueError, KeyError) as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        except StatementError as exc:
+            # Constraint and type errors the pre-checks cannot see, e.g. a
+            # value Postgres cannot cast to the column type
+            cause = exc.orig or exc
+            raise HTTPException(status_code=400, detail=f"{type(cause).__name__}: {cause}")
+    finally:
+        spool.close()
+    return {"stored": stored}
@@ -1,7 +1,7 @@
 from __future__ import annotations
 from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session
 from app.core.db import get_session
 from app.models.connection_event import ConnectionEvent
@@ -20,3 +20,12 @@ def list_events(
 ) -> List[ConnectionEvent]:
     repo = EventsRepository(session)
     return repo.list_events(limit, start_time, end_time)
+
+
+@router.get("/{event_id}/raw")
+def raw_event(event_id: int, session: Session = Depends(get_session)) -> dict:
+    repo = EventsRepository(session)
+    payload = repo.get_raw(event_id)
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Event payload not found")
+    return payload
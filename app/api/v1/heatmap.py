@@ -1,15 +1,16 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Union
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlmodel import Session
 
-from app.core.db import get_session
+from app.core.db import DATABASE_URL, get_session
 from app.repositories.events_repo import EventsRepository
 from app.schemas.heatmap import HeatmapResponse
 from app.services.analytics_service import AnalyticsService
+from app.services.heatmap_parallel import HeavyQueryBusy, ParallelHeatmap, heavy_query_slot
 
 
 router = APIRouter(prefix="/heatmap", tags=["heatmap"])
@@ -20,8 +21,20 @@ def heatmap(
     start_time: Optional[datetime] = None,
     end_time: Optional[datetime] = None,
     session: Session = Depends(get_session),
-) -> HeatmapResponse:
+) -> Union[HeatmapResponse, Response]:
+    svc = AnalyticsService()
+    parallel = ParallelHeatmap(DATABASE_URL)
+    start, end = parallel.window(session, start_time, end_time)
+    if parallel.eligible(start, end):
+        try:
+            with heavy_query_slot():
+                # Workers already encoded their slices; skip response_model
+                # re-validation and send the spliced body as is
+                body = svc.merge_heatmap_partials(parallel.partials(start, end))
+            return Response(body, media_type="application/json")
+        except HeavyQueryBusy as exc:
+            raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "5"})
+
     repo = EventsRepository(session)
     events = repo.list_with_coords(start_time, end_time)
-    svc = AnalyticsService()
     return svc.build_heatmap(events)
@@ -0,0 +1,23 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends
+from sqlmodel import Session
+from app.core.db import get_session
+from app.models.data_session import DataSession
+from app.repositories.sessions_repo import SessionsRepository
+
+
+router = APIRouter(prefix="/sims", tags=["sims"])
+
+
+@router.get("/{iccid}/sessions", response_model=List[DataSession])
+def list_sessions(
+    iccid: str,
+    limit: int = 100,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    session: Session = Depends(get_session),
+) -> List[DataSession]:
+    repo = SessionsRepository(session)
+    return repo.list_for_sim(iccid, limit, start_time, end_time)
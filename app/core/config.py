@@ -0,0 +1,26 @@
+"""Environment-driven settings shared across the app."""
+from __future__ import annotations
+import os
+
+
+# Codec for raw event payloads in the eventpayload side table: "zlib" or "none"
+PAYLOAD_COMPRESSION = os.getenv("PAYLOAD_COMPRESSION", "zlib").lower()
+
+# Mount the /demo seeding routes; off in production to keep them (and the
+# demo package) out of the worker's import graph
+DEMO_ENABLED = os.getenv("DEMO_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Heatmaps over windows of at least this many days are split into time slices
+# and aggregated in a process pool of HEATMAP_WORKERS (0 disables the pool).
+# One core is left for the server process that splices the slices and keeps
+# serving webhooks meanwhile
+HEATMAP_PARALLEL_MIN_DAYS = float(os.getenv("HEATMAP_PARALLEL_MIN_DAYS", "7"))
+HEATMAP_WORKERS = int(os.getenv("HEATMAP_WORKERS", str(max(1, (os.cpu_count() or 1) - 1))))
+
+# At most this many heavy heatmaps run at once; others wait up to
+# HEATMAP_HEAVY_WAIT seconds, then get a 503 instead of tying up the threadpool.
+# Both this cap and the pool are per server process: with `uvicorn --workers N`
+# up to N * HEATMAP_MAX_HEAVY heavy requests share N * HEATMAP_WORKERS pool
+# processes, so divide both by N
+HEATMAP_MAX_HEAVY = int(os.getenv("HEATMAP_MAX_HEAVY", "2"))
+HEATMAP_HEAVY_WAIT = float(os.getenv("HEATMAP_HEAVY_WAIT", "2"))
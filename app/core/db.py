@@ -1,12 +1,24 @@
 from __future__ import annotations
-from typing import Iterator
+from typing import Iterator, Optional
+import hashlib
+import json
+import logging
 import os
+from sqlalchemy import Column, String, Table, event, inspect, text
+from sqlalchemy.exc import DBAPIError
 from sqlmodel import SQLModel, Session, create_engine
+from app.core.config import PAYLOAD_COMPRESSION
+from app.models.aggregate_backfill import AggregateBackfill
+from app.models.event_payload import encode_payload
 
 
 # Read from env, default to local SQLite similar to previous implementation
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./events.db")
 
+# Aggregates rely on INSERT ... ON CONFLICT and per-dialect date functions
+# (see app.core.sqlutil), which exist for these dialects only
+SUPPORTED_DIALECTS = ("sqlite", "postgresql")
+
 engine = create_engine(
     DATABASE_URL,
     echo=False,
@@ -14,9 +26,195 @@ engine = create_engine(
 )
 
 
+if DATABASE_URL.startswith("sqlite") and ":memory:" not in DATABASE_URL:
+
+    @event.listens_for(engine, "connect")
+    def _sqlite_wal(dbapi_connection, _record) -> None:
+        # In rollback-journal mode a long read (a streaming /export) blocks
+        # every writer's commit; under WAL readers and the writer coexist
+        dbapi_connection.execute("PRAGMA journal_mode=WAL")
+
+
+# Single-row table holding the fingerprint of the schema the DB was last
+# brought up to; lets warm boots skip create_all's per-table reflection
+schema_version = Table(
+    "schemaversion",
+    SQLModel.metadata,
+    Column("version", String, primary_key=True),
+)
+
+
+def schema_fingerprint() -> str:
+    """Hash of every table, column, type and index declared by the models.
+
+    Changes whenever a model changes, so there is no version to bump by hand.
+    """
+    parts = []
+    for table in SQLModel.metadata.sorted_tables:
+        parts.append(table.name)
+        parts.extend(f"{c.name}:{c.type!r}:{c.nullable}" for c in table.columns)
+        parts.extend(sorted(f"{i.name}:{[c.name for c in i.columns]}" for i in table.indexes))
+    return hashlib.sha1("\n".join(parts).encode()).hexdigest()
+
+
+def _stored_fingerprint() -> Optional[str]:
+    try:
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT version FROM schemaversion")).scalar()
+    except DBAPIError:
+        return None
+
+
 def init_db() -> None:
-    """Create database tables for all SQLModel models."""
+    """Create or migrate tables for all SQLModel models.
+
+    A single lookup of the stored schema fingerprint short-circuits the
+    whole step when the database is already current. Fails fast on a
+    database outside ``SUPPORTED_DIALECTS``.
+    """
+    if engine.dialect.name not in SUPPORTED_DIALECTS:
+        raise RuntimeError(
+            f"DATABASE_URL uses '{engine.dialect.name}', but only "
+            f"{' and '.join(SUPPORTED_DIALECTS)} are supported"
+        )
+    fingerprint = schema_fingerprint()
+    if _stored_fingerprint() == fingerprint:
+        return
     SQLModel.metadata.create_all(engine)
+    _add_missing_columns()
+    _migrate_inline_payloads()
+    _drop_stale_indexes()
+    _schedule_backfills()
+    with engine.begin() as conn:
+        conn.execute(schema_version.delete())
+        conn.execute(schema_version.insert().values(version=fingerprint))
+
+
+def _add_missing_columns() -> None:
+    """Add nullable columns introduced after a table was first created.
+
+    ``create_all`` never alters existing tables, so databases created by an
+    older release would otherwise miss new columns (and their indexes).
+    """
+    inspector = inspect(engine)
+    for table in SQLModel.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        present = {c["name"] for c in inspector.get_columns(table.name)}
+        missing = [c for c in table.columns if c.name not in present and c.nullable]
+        if not missing:
+            continue
+        with engine.begin() as conn:
+            for column in missing:
+                col_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}"))
+            added = {c.name for c in missing}
+            for index in table.indexes:
+                if any(c.name in added for c in index.columns):
+                    index.create(conn, checkfirst=True)
+
+
+def _migrate_inline_payloads(chunk_size: int = 5000) -> None:
+    """Move ``connectionevent.payload`` from older releases into ``eventpayload``.
+
+    Backfills the promoted ``source`` and ``data_session_sid`` columns on the
+    way, then drops the inline column so rows shrink back to the flattened
+    fields.
+    """
+    inspector = inspect(engine)
+    if not inspector.has_table("connectionevent"):
+        return
+    if "payload" not in {c["name"] for c in inspector.get_columns("connectionevent")}:
+        return
+    # Chunks commit one by one; resume after the last one copied so a boot
+    # killed mid-migration can simply be restarted
+    with engine.connect() as conn:
+        last_id = conn.execute(text("SELECT COALESCE(MAX(event_id), 0) FROM eventpayload")).scalar()
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                text(
+                    "SELECT id, payload FROM connectionevent "
+                    "WHERE id > :last AND payload IS NOT NULL ORDER BY id LIMIT :n"
+                ),
+                {"last": last_id, "n": chunk_size},
+            ).all()
+            if not rows:
+                break
+            payloads, promoted = [], []
+            for event_id, payload in rows:
+                doc = (json.loads(payload) if isinstance(payload, str) else payload) or {}
+                encoding, body = encode_payload(doc, PAYLOAD_COMPRESSION)
+                payloads.append({"id": event_id, "enc": encoding, "body": body})
+                promoted.append(
+                    {
+                        "id": event_id,
+                        "src": doc.get("source"),
+                        "sid": (doc.get("data") or {}).get("data_session_sid"),
+                    }
+                )
+            conn.execute(
+                text("INSERT INTO eventpayload (event_id, encoding, body) VALUES (:id, :enc, :body)"),
+                payloads,
+            )
+            conn.execute(
+                text(
+                    "UPDATE connectionevent SET source = :src, "
+                    "data_session_sid = COALESCE(data_session_sid, :sid) WHERE id = :id"
+                ),
+                promoted,
+            )
+            last_id = rows[-1][0]
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE connectionevent DROP COLUMN payload"))
+
+
+def _drop_stale_indexes() -> None:
+    """Drop ``ix_*`` indexes that the models no longer declare."""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            declared = {index.name for index in table.indexes}
+            for index in inspector.get_indexes(table.name):
+                name = index["name"]
+                if name and name.startswith(f"ix_{table.name}_") and name not in declared:
+                    conn.execute(text(f"DROP INDEX {name}"))
+
+
+# Aggregate tables maintained at ingest, which miss history stored before them
+AGGREGATE_TABLES = ("datasession", "cellhourlystats", "simsketch", "simsketchday")
+
+
+def _schedule_backfills() -> None:
+    """Record which aggregate tables still need the events stored before them.
+
+    Folding all of history here would hold up the first boot after an
+    upgrade for as long as it takes, and a killed boot would roll it all
+    back. Instead each empty aggregate gets an ``AggregateBackfill`` row
+    marking the newest event; ``python -m app.services.backfill`` folds up
+    to it in resumable chunks while ingest keeps folding newer events.
+    """
+    with Session(engine) as session:
+        last_id = session.execute(text("SELECT MAX(id) FROM connectionevent")).scalar()
+        if last_id is None:
+            return
+        for table in AGGREGATE_TABLES:
+            if _has_rows(session, table) or session.get(AggregateBackfill, table) is not None:
+                continue
+            session.add(AggregateBackfill(aggregate=table, until_id=last_id))
+        session.commit()
+        pending = session.execute(text("SELECT COUNT(*) FROM aggregatebackfill")).scalar()
+    if pending:
+        logging.getLogger(__name__).warning(
+            "%d aggregate table(s) are missing older events; run `python -m app.services.backfill`",
+            pending,
+        )
+
+
+def _has_rows(session: Session, table: str) -> bool:
+    return session.execute(text(f"SELECT 1 FROM {table} LIMIT 1")).first() is not None
 
 
 def get_session() -> Iterator[Session]:
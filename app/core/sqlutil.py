@@ -0,0 +1,51 @@
+"""Dialect-aware SQL helpers shared by the repositories.
+
+Only SQLite and PostgreSQL are supported; ``init_db`` refuses anything else
+at startup rather than letting the first webhook fail.
+"""
+from __future__ import annotations
+from sqlalchemy import DateTime, Table, case, func, literal_column
+from sqlalchemy.orm import Session
+
+
+def upsert(session: Session, table: Table):
+    """Return an ``INSERT`` for ``table`` that supports ``ON CONFLICT``.
+
+    Aggregate tables merge into existing rows with ``on_conflict_do_update``
+    so concurrent writers add to counters atomically instead of racing on a
+    read-modify-write.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        raise NotImplementedError(f"INSERT ... ON CONFLICT is not supported on '{dialect}'")
+    return insert(table)
+
+
+def floor_hour_sql(session: Session, column):
+    """SQL counterpart of ``timeutil.floor_hour`` for set-based aggregation.
+
+    On SQLite the result is the exact text SQLAlchemy stores for a
+    ``DateTime``, so buckets written from Python and from SQL share keys.
+    Arguments are inlined rather than bound so the expression can be
+    repeated verbatim in ``GROUP BY``.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == "sqlite":
+        return func.strftime(literal_column("'%Y-%m-%d %H:00:00.000000'"), column, type_=DateTime)
+    if dialect == "postgresql":
+        return func.date_trunc(literal_column("'hour'"), column, type_=DateTime)
+    raise NotImplementedError(f"Hour bucketing is not supported on '{dialect}'")
+
+
+def earliest(a, b):
+    """``a`` or ``b``, whichever is earlier; NULL loses."""
+    return case((b.is_(None), a), (a.is_(None), b), (a < b, a), else_=b)
+
+
+def latest(a, b):
+    """``a`` or ``b``, whichever is later; NULL loses."""
+    return case((b.is_(None), a), (a.is_(None), b), (a > b, a), else_=b)
@@ -0,0 +1,22 @@
+"""Datetime helpers shared by the repositories."""
+from __future__ import annotations
+from datetime import datetime, timezone
+
+
+def naive_utc(value: datetime) -> datetime:
+    """Return ``value`` as naive UTC.
+
+    SQLite hands datetimes back without tzinfo while webhook payloads carry
+    it, so everything is compared and stored as naive UTC.
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def floor_hour(value: datetime) -> datetime:
+    return naive_utc(value).replace(minute=0, second=0, microsecond=0)
+
+
+def floor_day(value: datetime) -> datetime:
+    return floor_hour(value).replace(hour=0)
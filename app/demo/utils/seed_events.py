@@ -90,6 +90,7 @@ def build_session(
     lat, lon = random_lat_lon(region)
     network_name, iso_country, mcc, mnc = choose_network(region)
     sim_display_name = device_name
+    data_session_sid = random_string("PI")
 
     minutes_in_day = 24 * 60
     update_gap = random.randint(5, 20)
@@ -142,7 +143,7 @@ def build_session(
                 "data_upload": data_upload,
                 "data_download": data_download,
                 "sim_unique_name": sim_display_name,
-                "data_session_sid": random_string("PI"),
+                "data_session_sid": data_session_sid,
                 "data_session_start_time": start_time.isoformat(),
                 "data_session_end_time": session_end.isoformat() if session_end else None,
                 "data_session_data_total": data_total,
@@ -5,10 +5,19 @@ from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
 # Ensure models are imported so SQLModel metadata is populated before init_db
-from app.models import connection_event  # noqa: F401
+from app.models import (  # noqa: F401
+    aggregate_backfill,
+    cell_stats,
+    connection_event,
+    data_session,
+    event_payload,
+    sim_sketch,
+    sim_sketch_day,
+)
 
 from app.core.db import init_db
 from app.api.router import api
+from app.services.heatmap_parallel import shutdown_pool
 from app.web.pages import router as pages_router
 
 
@@ -21,6 +30,12 @@ def on_startup() -> None:
     init_db()
 
 
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    # The pool is created by the first heavy /heatmap request; no-op otherwise
+    shutdown_pool()
+
+
 # Pages and APIs
 app.include_router(pages_router)
 app.include_router(api)
@@ -0,0 +1,17 @@
+"""AggregateBackfill SQLModel definition."""
+from __future__ import annotations
+from sqlmodel import Field, SQLModel
+
+
+class AggregateBackfill(SQLModel, table=True):
+    """Events still to be folded into an aggregate table created after them.
+
+    ``init_db`` records ``until_id`` (the newest event at the time) instead of
+    folding history during boot; events after it are folded at ingest.
+    ``python -m app.services.backfill`` folds ``done_id + 1 .. until_id`` in
+    chunks, advancing ``done_id`` with each, and deletes the row when done.
+    """
+
+    aggregate: str = Field(primary_key=True)
+    until_id: int
+    done_id: int = 0
@@ -0,0 +1,37 @@
+"""CellHourlyStats SQLModel definition."""
+from __future__ import annotations
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import UniqueConstraint
+from sqlmodel import Field, SQLModel
+
+
+class CellHourlyStats(SQLModel, table=True):
+    """Per-cell counters for one hour, maintained incrementally at ingest.
+
+    Keyed by ``(network_mcc, network_mnc, lac, cell_id, bucket_start)``.
+    Window queries sum the hourly buckets instead of scanning raw events;
+    the mean position is kept as sums so buckets merge by addition.
+    """
+
+    __table_args__ = (
+        UniqueConstraint("network_mcc", "network_mnc", "lac", "cell_id", "bucket_start"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    network_mcc: str = ""
+    network_mnc: str = ""
+    lac: str = ""
+    cell_id: str
+    bucket_start: datetime = Field(index=True)
+
+    started_count: int = 0
+    updated_count: int = 0
+    ended_count: int = 0
+    event_count: int = 0
+    data_total: int = 0
+
+    last_seen: datetime
+    lat_sum: float = 0.0
+    lon_sum: float = 0.0
+    position_count: int = 0
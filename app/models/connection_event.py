@@ -2,43 +2,47 @@
 from __future__ import annotations
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import JSON
-from sqlmodel import Column, Field, SQLModel
+from sqlmodel import Field, SQLModel
 
 
 class ConnectionEvent(SQLModel, table=True):
-    """Stores a flattened snapshot of a Super SIM connection event."""
+    """Stores a flattened snapshot of a Super SIM connection event.
+
+    The raw webhook JSON lives in ``eventpayload``. Only columns that the
+    repositories filter on are indexed; every extra index is paid for on
+    each webhook insert.
+    """
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    event_sid: str = Field(index=True)
-    event_type: str = Field(index=True)
+    event_sid: str
+    event_type: str
     event_time: datetime = Field(index=True)
+    source: Optional[str] = Field(default=None, index=True)
 
-    sim_iccid: str = Field(index=True)
-    sim_unique_name: Optional[str] = Field(default=None, index=True)
-    sim_sid: Optional[str] = Field(default=None, index=True)
-    fleet_sid: Optional[str] = Field(default=None, index=True)
+    sim_iccid: str
+    sim_unique_name: Optional[str] = None
+    sim_sid: Optional[str] = None
+    fleet_sid: Optional[str] = None
 
     apn: Optional[str] = None
-    imei: Optional[str] = Field(default=None, index=True)
-    imsi: Optional[str] = Field(default=None, index=True)
+    imei: Optional[str] = None
+    imsi: Optional[str] = None
 
-    rat_type: Optional[str] = Field(default=None, index=True)
+    rat_type: Optional[str] = None
     ip_address: Optional[str] = None
-    account_sid: Optional[str] = Field(default=None, index=True)
+    account_sid: Optional[str] = None
 
-    network_mcc: Optional[str] = Field(default=None, index=True)
-    network_mnc: Optional[str] = Field(default=None, index=True)
+    network_mcc: Optional[str] = None
+    network_mnc: Optional[str] = None
     network_name: Optional[str] = None
     network_iso_country: Optional[str] = None
 
-    lac: Optional[str] = Field(default=None, index=True)
-    cell_id: Optional[str] = Field(default=None, index=True)
-    latitude: Optional[float] = Field(default=None, index=True)
-    longitude: Optional[float] = Field(default=None, index=True)
+    lac: Optional[str] = None
+    cell_id: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
     data_total: Optional[int] = None
     data_upload: Optional[int] = None
     data_download: Optional[int] = None
-
-    payload: Optional[dict] = Field(sa_column=Column(JSON), default=None)
+    data_session_sid: Optional[str] = Field(default=None, index=True)
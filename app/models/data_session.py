@@ -0,0 +1,41 @@
+"""DataSession SQLModel definition."""
+from __future__ import annotations
+from datetime import datetime
+from typing import Optional
+from sqlmodel import Field, SQLModel
+
+
+class DataSession(SQLModel, table=True):
+    """One Super SIM data session, folded from its started/updated/ended events.
+
+    Rows are maintained incrementally at ingest so per-SIM session history and
+    usage rankings never need to re-scan ``connectionevent``.
+    """
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    data_session_sid: str = Field(index=True, unique=True)
+    sim_iccid: str = Field(index=True)
+    sim_unique_name: Optional[str] = None
+
+    started_at: datetime
+    last_update_at: datetime = Field(index=True)
+    ended_at: Optional[datetime] = None
+
+    data_total: int = 0
+    data_upload: int = 0
+    data_download: int = 0
+    event_count: int = 0
+
+    network_mcc: Optional[str] = None
+    network_mnc: Optional[str] = None
+    network_name: Optional[str] = None
+    lac: Optional[str] = None
+    cell_id: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+    # When the name, network and location above were last reported, so a
+    # late batch of older events cannot overwrite fresher values
+    named_at: Optional[datetime] = None
+    networked_at: Optional[datetime] = None
+    located_at: Optional[datetime] = None
@@ -0,0 +1,41 @@
+"""EventPayload SQLModel definition."""
+from __future__ import annotations
+import json
+import zlib
+from typing import Optional
+from sqlalchemy import Column, ForeignKey, Integer, LargeBinary
+from sqlmodel import Field, SQLModel
+
+
+class EventPayload(SQLModel, table=True):
+    """Raw webhook JSON for a ``ConnectionEvent``, kept out of the hot table.
+
+    Only ``/events/{id}/raw`` and payload-inclusive exports read it, so list,
+    heatmap and analytics queries never pull the blob into memory.
+    """
+
+    event_id: Optional[int] = Field(
+        default=None,
+        sa_column=Column(
+            Integer,
+            ForeignKey("connectionevent.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+    )
+    encoding: str = "json"
+    body: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+
+
+def encode_payload(payload, compression: str) -> tuple[str, bytes]:
+    """Serialize a payload (dict or JSON text) to ``(encoding, body)``."""
+    text = payload if isinstance(payload, str) else json.dumps(payload, separators=(",", ":"))
+    raw = text.encode()
+    if compression == "zlib":
+        return "zlib", zlib.compress(raw, 1)
+    return "json", raw
+
+
+def decode_payload(encoding: str, body: bytes) -> dict:
+    if encoding == "zlib":
+        body = zlib.decompress(body)
+    return json.loads(body)
@@ -0,0 +1,23 @@
+"""SimSketch SQLModel definition."""
+from __future__ import annotations
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Column, LargeBinary, UniqueConstraint
+from sqlmodel import Field, SQLModel
+
+
+class SimSketch(SQLModel, table=True):
+    """HyperLogLog of SIM ICCIDs seen in one lat/lon tile during one hour.
+
+    Tiles are ``TILE_DEGREES`` squares indexed by ``floor(coord / size)``.
+    Sketches for any bbox/window merge by register-wise max at query time;
+    whole days are read from the ``SimSketchDay`` rollup instead.
+    """
+
+    __table_args__ = (UniqueConstraint("tile_lat", "tile_lon", "bucket_start"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    tile_lat: int
+    tile_lon: int
+    bucket_start: datetime = Field(index=True)
+    registers: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
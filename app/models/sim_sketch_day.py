@@ -0,0 +1,22 @@
+"""SimSketchDay SQLModel definition."""
+from __future__ import annotations
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Column, LargeBinary, UniqueConstraint
+from sqlmodel import Field, SQLModel
+
+
+class SimSketchDay(SQLModel, table=True):
+    """Daily rollup of ``SimSketch``: the ICCIDs seen in one tile during one UTC day.
+
+    Equal to the register-wise max of that day's hourly sketches, so long
+    windows merge one row per tile and day instead of 24.
+    """
+
+    __table_args__ = (UniqueConstraint("tile_lat", "tile_lon", "bucket_start"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    tile_lat: int
+    tile_lon: int
+    bucket_start: datetime = Field(index=True)
+    registers: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
@@ -0,0 +1,241 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import datetime
+from sqlalchemy import and_, case, delete, func, literal_column
+from sqlmodel import Session, select
+from app.core.sqlutil import floor_hour_sql, latest, upsert
+from app.core.timeutil import floor_hour, naive_utc
+from app.models.cell_stats import CellHourlyStats
+from app.models.connection_event import ConnectionEvent
+
+
+CellKey = Tuple[str, str, str, str, datetime]
+
+# Counter bumped for each event type suffix (…data-session.<suffix>)
+TYPE_COUNTERS = {
+    "started": "started_count",
+    "updated": "updated_count",
+    "ended": "ended_count",
+}
+METRICS = {
+    "ended": CellHourlyStats.ended_count,
+    "started": CellHourlyStats.started_count,
+    "updated": CellHourlyStats.updated_count,
+    "events": CellHourlyStats.event_count,
+    "bytes": CellHourlyStats.data_total,
+}
+
+
+def _cell_key(e) -> Optional[CellKey]:
+    if not e.cell_id:
+        return None
+    return (
+        e.network_mcc or "",
+        e.network_mnc or "",
+        e.lac or "",
+        e.cell_id,
+        floor_hour(e.event_time),
+    )
+
+
+class CellsRepository:
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    def apply_events(self, events: Iterable[ConnectionEvent], sign: int = 1) -> int:
+        """Add (``sign=1``) or remove (``sign=-1``) events from hourly cell buckets.
+
+        Accepts anything exposing the ``ConnectionEvent`` attributes. The
+        batch is folded into one delta per bucket and merged with a single
+        ``INSERT ... ON CONFLICT DO UPDATE`` that adds the counters in SQL, so
+        concurrent writers cannot lose updates; buckets left with no events
+        are deleted. ``last_seen`` only ever moves forward. Caller commits.
+        Returns number of buckets touched.
+        """
+        deltas: Dict[CellKey, dict] = {}
+        for e in events:
+            key = _cell_key(e)
+            if key is None:
+                continue
+            row = deltas.get(key)
+            if row is None:
+                mcc, mnc, lac, cell_id, bucket = key
+                row = deltas[key] = {
+                    "network_mcc": mcc,
+                    "network_mnc": mnc,
+                    "lac": lac,
+                    "cell_id": cell_id,
+                    "bucket_start": bucket,
+                    "started_count": 0,
+                    "updated_count": 0,
+                    "ended_count": 0,
+                    "event_count": 0,
+                    "data_total": 0,
+                    "last_seen": bucket,
+                    "lat_sum": 0.0,
+                    "lon_sum": 0.0,
+                    "position_count": 0,
+                }
+            counter = TYPE_COUNTERS.get((e.event_type or "").rsplit(".", 1)[-1].lower())
+            if counter:
+                row[counter] += sign
+            row["event_count"] += sign
+            row["data_total"] += sign * (e.data_total or 0)
+            if e.latitude is not None and e.longitude is not None:
+                row["lat_sum"] += sign * e.latitude
+                row["lon_sum"] += sign * e.longitude
+                row["position_count"] += sign
+            if sign > 0:
+                row["last_seen"] = max(naive_utc(row["last_seen"]), naive_utc(e.event_time))
+        if not deltas:
+            return 0
+
+        stmt = upsert(self.session, CellHourlyStats.__table__)
+        self.session.execute(self._merge(stmt, sign), list(deltas.values()))
+        if sign < 0:
+            self._drop_empty({key[4] for key in deltas})
+        return len(deltas)
+
+    def apply_where(self, where, sign: int = 1) -> int:
+        """Add or remove every event matching ``where`` in SQL.
+
+        Set-based counterpart of ``apply_events`` for backfills, bulk loads
+        and purges: one ``INSERT ... SELECT ... GROUP BY`` merged with the
+        same ON CONFLICT clause. Caller commits. Returns the driver's row
+        count.
+        """
+        c = ConnectionEvent.__table__.c
+        blank = literal_column("''")
+        key = [
+            func.coalesce(c.network_mcc, blank),
+            func.coalesce(c.network_mnc, blank),
+            func.coalesce(c.lac, blank),
+            c.cell_id,
+            floor_hour_sql(self.session, c.event_time),
+        ]
+        event_type = func.lower(c.event_type)
+        located = and_(c.latitude.is_not(None), c.longitude.is_not(None))
+
+        def total(value):
+            return func.coalesce(func.sum(value), 0) * sign
+
+        grouped = (
+            select(
+                *key,
+                total(case((event_type.like("%.started"), 1), else_=0)),
+                total(case((event_type.like("%.updated"), 1), else_=0)),
+                total(case((event_type.like("%.ended"), 1), else_=0)),
+                func.count() * sign,
+                total(c.data_total),
+                func.max(c.event_time) if sign > 0 else key[4],
+                total(case((located, c.latitude), else_=0.0)),
+                total(case((located, c.longitude), else_=0.0)),
+                total(case((located, 1), else_=0)),
+            )
+            .where(where, c.cell_id.is_not(None), c.cell_id != "")
+            .group_by(*key)
+        )
+        columns = [
+            "network_mcc",
+            "network_mnc",
+            "lac",
+            "cell_id",
+            "bucket_start",
+            "started_count",
+            "updated_count",
+            "ended_count",
+            "event_count",
+            "data_total",
+            "last_seen",
+            "lat_sum",
+            "lon_sum",
+            "position_count",
+        ]
+        stmt = upsert(self.session, CellHourlyStats.__table__).from_select(columns, grouped)
+        count = self.session.execute(self._merge(stmt, sign)).rowcount
+        if sign < 0:
+            self._drop_empty()
+        return count
+
+    def _drop_empty(self, buckets=None) -> None:
+        table = CellHourlyStats.__table__
+        stmt = delete(table).where(table.c.event_count <= 0)
+        if buckets is not None:
+            stmt = stmt.where(table.c.bucket_start.in_(buckets))
+        self.session.execute(stmt)
+
+    @staticmethod
+    def _merge(stmt, sign: int):
+        """Attach the ON CONFLICT clause that adds a delta row to its bucket."""
+        t = CellHourlyStats.__table__.c
+        new = stmt.excluded
+        added = {
+            name: t[name] + new[name]
+            for name in (
+                "started_count",
+                "updated_count",
+                "ended_count",
+                "event_count",
+                "data_total",
+                "lat_sum",
+                "lon_sum",
+                "position_count",
+            )
+        }
+        if sign > 0:
+            added["last_seen"] = latest(new.last_seen, t.last_seen)
+        return stmt.on_conflict_do_update(
+            index_elements=[t.network_mcc, t.network_mnc, t.lac, t.cell_id, t.bucket_start],
+            set_=added,
+        )
+
+    def top_cells(
+        self,
+        metric: str = "ended",
+        limit: int = 10,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Tuple[List[dict], Optional[datetime], Optional[datetime]]:
+        """Rank cells by ``metric`` summed over the hourly buckets in the window.
+
+        Buckets are whole hours, so ``start``/``end`` are widened to the hours
+        containing them. Also returns the first and last bucket of the window;
+        open ends come from every bucket in it, not just the ranked cells, so
+        per-hour rates do not depend on ``limit``.
+        """
+        limit = max(1, min(1000, limit))
+        c = CellHourlyStats
+        ranked = func.sum(METRICS.get(metric, c.ended_count)).label("ranked")
+        stmt = select(
+            c.network_mcc,
+            c.network_mnc,
+            c.lac,
+            c.cell_id,
+            func.sum(c.started_count).label("started"),
+            func.sum(c.updated_count).label("updated"),
+            func.sum(c.ended_count).label("ended"),
+            func.sum(c.event_count).label("events"),
+            func.sum(c.data_total).label("data_total"),
+            func.max(c.last_seen).label("last_seen"),
+            func.sum(c.lat_sum).label("lat_sum"),
+            func.sum(c.lon_sum).label("lon_sum"),
+            func.sum(c.position_count).label("positions"),
+            ranked,
+        )
+        bounds = select(func.min(c.bucket_start), func.max(c.bucket_start))
+        if start:
+            stmt = stmt.where(c.bucket_start >= floor_hour(start))
+            bounds = bounds.where(c.bucket_start >= floor_hour(start))
+        if end:
+            stmt = stmt.where(c.bucket_start <= floor_hour(end))
+            bounds = bounds.where(c.bucket_start <= floor_hour(end))
+        stmt = (
+            stmt.group_by(c.network_mcc, c.network_mnc, c.lac, c.cell_id)
+            .order_by(ranked.desc())
+            .limit(limit)
+        )
+        rows = [dict(row) for row in self.session.execute(stmt).mappings()]
+        if start and end:
+            return rows, floor_hour(start), floor_hour(end)
+        first, last = self.session.execute(bounds).one()
+        return rows, floor_hour(start) if start else first, floor_hour(end) if end else last
@@ -1,15 +1,139 @@
 from __future__ import annotations
-from typing import List, Optional
+from types import SimpleNamespace
+from typing import Any, List, Optional, Tuple
 from datetime import datetime
-from sqlalchemy import text
+from sqlalchemy import and_, insert, or_, text
+from sqlalchemy.exc import StatementError
 from sqlmodel import Session, select
+from app.core.config import PAYLOAD_COMPRESSION
+from app.models.aggregate_backfill import AggregateBackfill
 from app.models.connection_event import ConnectionEvent
+from app.models.event_payload import EventPayload, decode_payload, encode_payload
+from app.repositories.cells_repo import CellsRepository
+from app.repositories.sessions_repo import SessionsRepository
+from app.repositories.sketches_repo import SketchesRepository, sketch_key
+
+
+def id_ranges(ids: List[int], ranges: Optional[List[Tuple[int, int]]] = None) -> List[Tuple[int, int]]:
+    """Append ``ids`` to ``ranges`` as inclusive ``(lo, hi)`` runs of consecutive ids.
+
+    A bulk load's ids are one run on SQLite and a handful on Postgres, so
+    this stays tiny where the ids themselves would not.
+    """
+    ranges = [] if ranges is None else ranges
+    for event_id in sorted(ids):
+        if ranges and ranges[-1][1] + 1 == event_id:
+            ranges[-1] = (ranges[-1][0], event_id)
+        else:
+            ranges.append((event_id, event_id))
+    return ranges
 
 
 class EventsRepository:
     def __init__(self, session: Session) -> None:
         self.session = session
 
+    def add_many(self, rows: List[dict], payloads: List[Optional[Any]]) -> List[int]:
+        """Insert flattened events plus their raw payloads; caller commits.
+
+        Sessions, cell buckets and sketches are folded from the in-memory
+        rows in the same transaction. Returns the new event ids.
+        """
+        if not rows:
+            return []
+        ids = self.insert_rows(rows)
+        self.insert_payloads(
+            ids,
+            [None if p is None else encode_payload(p, PAYLOAD_COMPRESSION) for p in payloads],
+        )
+        events = [SimpleNamespace(**row) for row in rows]
+        SessionsRepository(self.session).apply_events(events)
+        CellsRepository(self.session).apply_events(events)
+        SketchesRepository(self.session).apply_events(events)
+        return ids
+
+    def insert_rows(self, rows: List[dict]) -> List[int]:
+        """Insert ``connectionevent`` rows without touching aggregates; caller commits.
+
+        Every row must carry the same keys. Returns the new ids in row order.
+        """
+        table = ConnectionEvent.__table__
+        if self.session.get_bind().dialect.name == "sqlite":
+            self._executemany(table, rows)
+            # One executemany under the write lock hands out contiguous rowids
+            # ending at last_insert_rowid(); ordered RETURNING would instead
+            # degrade to a statement per row on SQLite
+            last = self.session.execute(text("SELECT last_insert_rowid()")).scalar_one()
+            return list(range(last - len(rows) + 1, last + 1))
+        stmt = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+        return self.session.execute(stmt, rows).scalars().all()
+
+    def insert_payloads(self, ids: List[int], encoded: List[Optional[Tuple[str, bytes]]]) -> None:
+        """Store already-encoded ``(encoding, body)`` payloads for ``ids``."""
+        blobs = [
+            {"event_id": event_id, "encoding": blob[0], "body": blob[1]}
+            for event_id, blob in zip(ids, encoded)
+            if blob is not None
+        ]
+        if not blobs:
+            return
+        table = EventPayload.__table__
+        if self.session.get_bind().dialect.name == "sqlite":
+            self._executemany(table, blobs)
+        else:
+            self.session.execute(insert(table), blobs)
+
+    def fold_aggregates(self, ranges: List[Tuple[int, int]]) -> None:
+        """Fold already-inserted events into every aggregate in SQL; caller commits.
+
+        Bulk-load counterpart of the per-row folds in ``add_many``: events
+        with ids in the inclusive ``ranges`` (see ``id_ranges``) go into
+        sessions and cell buckets with one ``INSERT ... SELECT ... GROUP BY``
+        each, however many batches they were inserted in.
+        """
+        if not ranges:
+            return
+        c = ConnectionEvent.__table__.c
+        where = or_(*(c.id.between(lo, hi) for lo, hi in ranges))
+        SessionsRepository(self.session).apply_where(where)
+        CellsRepository(self.session).apply_where(where)
+        SketchesRepository(self.session).apply_where(where)
+
+    def _executemany(self, table, rows: List[dict]) -> None:
+        """``executemany`` straight on the DBAPI cursor.
+
+        Values are converted by the columns' own bind processors, so they are
+        stored exactly as Core would store them, without Core's per-row
+        parameter building (the bulk of an executemany's Python cost). A value
+        its processor rejects raises ``StatementError``, as it would via Core.
+        """
+        conn = self.session.connection()
+        names = list(rows[0])
+        sql = f"INSERT INTO {table.name} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})"
+        processors = [
+            (i, proc)
+            for i, proc in enumerate(
+                table.c[name].type.dialect_impl(conn.dialect).bind_processor(conn.dialect)
+                for name in names
+            )
+            if proc is not None
+        ]
+        if not processors:
+            values = [tuple(map(row.get, names)) for row in rows]
+        else:
+            values = []
+            for row in rows:
+                value = list(map(row.get, names))
+                for i, proc in processors:
+                    if value[i] is not None:
+                        try:
+                            value[i] = proc(value[i])
+                        except (TypeError, ValueError) as exc:
+                            orig = type(exc)(f"{names[i]}: {exc}")
+                            raise StatementError(str(orig), sql, None, orig) from exc
+                values.append(tuple(value))
+        conn.exec_driver_sql(sql, values)
+
     def list_events(
         self,
         limit: int = 100,
@@ -26,25 +150,63 @@ class EventsRepository:
         return self.session.exec(stmt).all()
 
     def purge_by_source(self, source: str) -> int:
-        """Delete events whose JSON payload.root.source equals the given value.
+        """Delete events whose webhook ``source`` equals the given value.
 
-        Uses SQLite JSON1 function json_extract; works on SQLite and may be
-        adapted by SQLAlchemy on other backends that support similar JSON ops.
+        Derived session rows and side-table payloads go with them (SQLite does
+        not enforce the payload foreign key cascade unless asked to), the
+        events are subtracted from the per-cell hourly buckets and the
+        distinct-SIM sketches they touched are rebuilt.
         Returns number of rows deleted.
         """
+        params = {"src": source}
+        # Cell buckets are additive, so back the purged events out of them,
+        # except those a pending backfill has not added yet
+        purged = ConnectionEvent.source == source
+        backfill = self.session.get(AggregateBackfill, "cellhourlystats", with_for_update=True)
+        if backfill is not None:
+            purged = and_(purged, ~ConnectionEvent.id.between(backfill.done_id + 1, backfill.until_id))
+        CellsRepository(self.session).apply_where(purged, sign=-1)
+        doomed = self.session.execute(
+            select(
+                ConnectionEvent.event_time,
+                ConnectionEvent.latitude,
+                ConnectionEvent.longitude,
+                ConnectionEvent.sim_iccid,
+            ).where(ConnectionEvent.source == source)
+        )
+        doomed_sketches = {key for key in map(sketch_key, doomed) if key is not None}
+        self.session.exec(
+            text(
+                "DELETE FROM datasession WHERE data_session_sid IN ("
+                "SELECT data_session_sid FROM connectionevent WHERE source = :src)"
+            ).bindparams(**params)
+        )
+        self.session.exec(
+            text(
+                "DELETE FROM eventpayload WHERE event_id IN ("
+                "SELECT id FROM connectionevent WHERE source = :src)"
+            ).bindparams(**params)
+        )
         # SQLModel default table name is the lowercased class name
-        stmt = text(
-            "DELETE FROM connectionevent WHERE json_extract(payload, '$.source') = :src"
-        ).bindparams(src=source)
+        stmt = text("DELETE FROM connectionevent WHERE source = :src").bindparams(**params)
         result = self.session.exec(stmt)
         # In SQLAlchemy 2.0, rowcount is available on the CursorResult
         try:
             deleted = result.rowcount or 0
         except Exception:
             deleted = 0
+        # Sketches cannot subtract; re-derive the touched ones from survivors
+        SketchesRepository(self.session).rebuild(doomed_sketches)
         self.session.commit()
         return deleted
 
+    def get_raw(self, event_id: int) -> Optional[dict]:
+        """Return the original webhook JSON for one event, if stored."""
+        row = self.session.get(EventPayload, event_id)
+        if row is None:
+            return None
+        return decode_payload(row.encoding, row.body)
+
     def list_with_coords(
         self,
         start: Optional[datetime] = None,
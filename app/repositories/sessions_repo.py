@@ -0,0 +1,278 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional
+from datetime import datetime
+from sqlalchemy import and_, case, func, or_, true
+from sqlmodel import Session, select
+from app.core.sqlutil import earliest, latest, upsert
+from app.core.timeutil import naive_utc
+from app.models.connection_event import ConnectionEvent
+from app.models.data_session import DataSession
+
+
+ENDED_TYPE = "com.twilio.iot.supersim.connection.data-session.ended"
+
+
+class SessionsRepository:
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    def apply_events(self, events: Iterable[ConnectionEvent]) -> int:
+        """Fold connection events into their ``DataSession`` rows.
+
+        Anything exposing the ``ConnectionEvent`` attributes is accepted, so
+        the bulk importer can pass plain rows without building ORM objects.
+
+        The batch is folded into one delta row per session and merged with a
+        single ``INSERT ... ON CONFLICT DO UPDATE``, so counters are added in
+        SQL and concurrent batches for the same session cannot lose updates.
+        Bytes are accumulated from each event's per-update ``data_total``.
+        Events may arrive out of order, so start/last-update are widened
+        rather than overwritten. Caller commits. Returns number of sessions
+        touched.
+        """
+        by_sid: Dict[str, List[ConnectionEvent]] = {}
+        for e in events:
+            if e.data_session_sid:
+                by_sid.setdefault(e.data_session_sid, []).append(e)
+        if not by_sid:
+            return 0
+
+        deltas: List[dict] = []
+        for sid, batch in by_sid.items():
+            row = None
+            for e in sorted(batch, key=lambda x: naive_utc(x.event_time)):
+                ts = naive_utc(e.event_time)
+                if row is None:
+                    row = {
+                        "data_session_sid": sid,
+                        "sim_iccid": e.sim_iccid,
+                        "sim_unique_name": None,
+                        "started_at": ts,
+                        "last_update_at": ts,
+                        "ended_at": None,
+                        "data_total": 0,
+                        "data_upload": 0,
+                        "data_download": 0,
+                        "event_count": 0,
+                        "network_mcc": None,
+                        "network_mnc": None,
+                        "network_name": None,
+                        "lac": None,
+                        "cell_id": None,
+                        "latitude": None,
+                        "longitude": None,
+                        "named_at": None,
+                        "networked_at": None,
+                        "located_at": None,
+                    }
+                    deltas.append(row)
+                row["last_update_at"] = ts
+                if (e.event_type or "").lower() == ENDED_TYPE:
+                    row["ended_at"] = ts
+                row["data_total"] += e.data_total or 0
+                row["data_upload"] += e.data_upload or 0
+                row["data_download"] += e.data_download or 0
+                row["event_count"] += 1
+                if e.sim_unique_name is not None:
+                    row["sim_unique_name"] = e.sim_unique_name
+                    row["named_at"] = ts
+                if e.network_mcc is not None:
+                    row["network_mcc"] = e.network_mcc
+                    row["network_mnc"] = e.network_mnc
+                    row["network_name"] = e.network_name
+                    row["networked_at"] = ts
+                if e.latitude is not None and e.longitude is not None:
+                    row["lac"] = e.lac
+                    row["cell_id"] = e.cell_id
+                    row["latitude"] = e.latitude
+                    row["longitude"] = e.longitude
+                    row["located_at"] = ts
+
+        self.session.execute(self._merge(upsert(self.session, DataSession.__table__)), deltas)
+        return len(by_sid)
+
+    def apply_where(self, where) -> int:
+        """Fold every event matching ``where`` into ``datasession`` in SQL.
+
+        Set-based counterpart of ``apply_events`` for backfills and bulk
+        loads: one ``INSERT ... SELECT ... GROUP BY`` merged with the same
+        ON CONFLICT clause. The latest name, network and located position
+        per session are picked with ``first_value`` windows. Caller commits. Returns the driver's row count.
+        """
+        c = ConnectionEvent.__table__.c
+        located = and_(c.latitude.is_not(None), c.longitude.is_not(None))
+
+        def last_known(column, known):
+            """Value from the session's latest event where ``known`` holds."""
+            return func.first_value(case((known, column))).over(
+                partition_by=c.data_session_sid,
+                order_by=(known.desc(), c.event_time.desc()),
+            )
+
+        # Three window orderings instead of one per column: the network
+        # fields travel together, as do the location fields
+        named = c.sim_unique_name.is_not(None)
+        networked = c.network_mcc.is_not(None)
+        ended = func.lower(c.event_type) == ENDED_TYPE
+        events = (
+            select(
+                c.data_session_sid,
+                c.sim_iccid,
+                c.event_time,
+                case((ended, c.event_time)).label("ended_time"),
+                func.coalesce(c.data_total, 0).label("data_total"),
+                func.coalesce(c.data_upload, 0).label("data_upload"),
+                func.coalesce(c.data_download, 0).label("data_download"),
+                last_known(c.sim_unique_name, named).label("sim_unique_name"),
+                last_known(c.network_mcc, networked).label("network_mcc"),
+                last_known(c.network_mnc, networked).label("network_mnc"),
+                last_known(c.network_name, networked).label("network_name"),
+                last_known(c.lac, located).label("lac"),
+                last_known(c.cell_id, located).label("cell_id"),
+                last_known(c.latitude, located).label("latitude"),
+                last_known(c.longitude, located).label("longitude"),
+                case((named, c.event_time)).label("named_at"),
+                case((networked, c.event_time)).label("networked_at"),
+                case((located, c.event_time)).label("located_at"),
+            )
+            .where(where, c.data_session_sid.is_not(None), c.data_session_sid != "")
+            .subquery()
+        )
+        e = events.c
+        grouped = select(
+            e.data_session_sid,
+            func.min(e.sim_iccid),
+            func.min(e.event_time),
+            func.max(e.event_time),
+            func.max(e.ended_time),
+            func.sum(e.data_total),
+            func.sum(e.data_upload),
+            func.sum(e.data_download),
+            func.count(),
+            func.max(e.sim_unique_name),
+            func.max(e.network_mcc),
+            func.max(e.network_mnc),
+            func.max(e.network_name),
+            func.max(e.lac),
+            func.max(e.cell_id),
+            func.max(e.latitude),
+            func.max(e.longitude),
+            func.max(e.named_at),
+            func.max(e.networked_at),
+            func.max(e.located_at),
+        ).where(true()).group_by(e.data_session_sid)
+        columns = [
+            "data_session_sid",
+            "sim_iccid",
+            "started_at",
+            "last_update_at",
+            "ended_at",
+            "data_total",
+            "data_upload",
+            "data_download",
+            "event_count",
+            "sim_unique_name",
+            "network_mcc",
+            "network_mnc",
+            "network_name",
+            "lac",
+            "cell_id",
+            "latitude",
+            "longitude",
+            "named_at",
+            "networked_at",
+            "located_at",
+        ]
+        # SQLite needs the WHERE above to parse INSERT ... SELECT ... ON CONFLICT
+        stmt = upsert(self.session, DataSession.__table__).from_select(columns, grouped)
+        return self.session.execute(self._merge(stmt)).rowcount
+
+    @staticmethod
+    def _merge(stmt):
+        """Attach the ON CONFLICT clause that folds a delta row into a session.
+
+        The name, the network fields and the location each follow whichever
+        side reported them last (``named_at``, ``networked_at``,
+        ``located_at``), so the result does not depend on the order batches
+        arrive in. Rows folded before those columns existed count as
+        reported at their ``last_update_at``.
+        """
+        t = DataSession.__table__.c
+        new = stmt.excluded
+
+        def fresher(marker: str, seen_at: str):
+            stored_at = case((t[marker].is_(None), None), else_=func.coalesce(t[seen_at], t.last_update_at))
+            return and_(new[seen_at].is_not(None), or_(stored_at.is_(None), new[seen_at] >= stored_at))
+
+        groups = {
+            "named_at": ("sim_unique_name", ["sim_unique_name"]),
+            "networked_at": ("network_mcc", ["network_mcc", "network_mnc", "network_name"]),
+            "located_at": ("latitude", ["lac", "cell_id", "latitude", "longitude"]),
+        }
+        descriptive = {}
+        for seen_at, (marker, names) in groups.items():
+            take = fresher(marker, seen_at)
+            for name in names + [seen_at]:
+                descriptive[name] = case((take, new[name]), else_=t[name])
+
+        return stmt.on_conflict_do_update(
+            index_elements=[t.data_session_sid],
+            set_={
+                "started_at": earliest(new.started_at, t.started_at),
+                "last_update_at": latest(new.last_update_at, t.last_update_at),
+                "ended_at": latest(new.ended_at, t.ended_at),
+                "data_total": t.data_total + new.data_total,
+                "data_upload": t.data_upload + new.data_upload,
+                "data_download": t.data_download + new.data_download,
+                "event_count": t.event_count + new.event_count,
+                **descriptive,
+            },
+        )
+
+    def list_for_sim(
+        self,
+        iccid: str,
+        limit: int = 100,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[DataSession]:
+        limit = max(1, min(1000, limit))
+        stmt = select(DataSession).where(DataSession.sim_iccid == iccid)
+        if start:
+            stmt = stmt.where(DataSession.last_update_at >= start)
+        if end:
+            stmt = stmt.where(DataSession.started_at <= end)
+        stmt = stmt.order_by(DataSession.started_at.desc()).limit(limit)
+        return self.session.exec(stmt).all()
+
+    def top_usage(
+        self,
+        group_by: str = "sim",
+        limit: int = 10,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[tuple]:
+        """Rank SIMs or networks by bytes over sessions overlapping the window.
+
+        Rows are ``(key..., data_total, data_upload, data_download, sessions)``.
+        """
+        limit = max(1, min(1000, limit))
+        if group_by == "network":
+            keys = [DataSession.network_mcc, DataSession.network_mnc, DataSession.network_name]
+        else:
+            keys = [DataSession.sim_iccid, func.max(DataSession.sim_unique_name)]
+        total = func.sum(DataSession.data_total)
+        stmt = select(
+            *keys,
+            total,
+            func.sum(DataSession.data_upload),
+            func.sum(DataSession.data_download),
+            func.count(DataSession.id),
+        )
+        if start:
+            stmt = stmt.where(DataSession.last_update_at >= start)
+        if end:
+            stmt = stmt.where(DataSession.started_at <= end)
+        group_cols = keys[:1] if group_by != "network" else keys
+        stmt = stmt.group_by(*group_cols).order_by(total.desc()).limit(limit)
+        return list(self.session.exec(stmt).all())
@@ -0,0 +1,272 @@
+from __future__ import annotations
+import math
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy import delete, update
+from sqlmodel import Session, select
+from app.core.sqlutil import floor_hour_sql, upsert
+from app.core.timeutil import floor_day, floor_hour, naive_utc
+from app.models.connection_event import ConnectionEvent
+from app.models.sim_sketch import SimSketch
+from app.models.sim_sketch_day import SimSketchDay
+from app.services.hyperloglog import DEFAULT_PRECISION, HyperLogLog
+
+
+TILE_DEGREES = 0.1
+
+SketchKey = Tuple[int, int, datetime]
+
+# Bucket of an hourly key at each level; both tables share the key columns
+BUCKETS: Dict[type, Callable[[datetime], datetime]] = {
+    SimSketch: floor_hour,
+    SimSketchDay: floor_day,
+}
+
+
+def tile_of(lat: float, lon: float) -> Tuple[int, int]:
+    return math.floor(lat / TILE_DEGREES), math.floor(lon / TILE_DEGREES)
+
+
+def sketch_key(e) -> Optional[SketchKey]:
+    if e.latitude is None or e.longitude is None or not e.sim_iccid:
+        return None
+    return (*tile_of(e.latitude, e.longitude), floor_hour(e.event_time))
+
+
+class SketchesRepository:
+    # Levels written by ``apply_events``/``apply_where``, hourly first so
+    # every writer locks rows in the same order
+    levels: Tuple[type, ...] = (SimSketch, SimSketchDay)
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    def _load(
+        self, keys: Iterable[SketchKey], lock: bool = False, model: type = SimSketch
+    ) -> Dict[SketchKey, dict]:
+        keys = list(keys)
+        table = model.__table__
+        stmt = select(table).where(
+            table.c.tile_lat.in_({k[0] for k in keys}),
+            table.c.bucket_start.in_({k[2] for k in keys}),
+        )
+        if lock:
+            # Same lock order in every writer, so overlapping batches queue
+            # instead of deadlocking (a no-op on SQLite's database lock)
+            stmt = stmt.order_by(table.c.id).with_for_update()
+        wanted = set(keys)
+        found = {}
+        for row in self.session.execute(stmt).mappings():
+            key = (row["tile_lat"], row["tile_lon"], naive_utc(row["bucket_start"]))
+            if key in wanted:
+                found[key] = dict(row)
+        return found
+
+    def apply_events(self, events: Iterable[ConnectionEvent]) -> int:
+        """Add each event's ICCID to its tile/hour sketch and daily rollup; caller commits.
+
+        Accepts anything exposing the ``ConnectionEvent`` attributes. Events
+        without coordinates are skipped. Registers can only be merged in
+        Python, so a row is first ensured for every key (``ON CONFLICT DO
+        NOTHING``) and the touched rows are then read ``FOR UPDATE``;
+        concurrent batches for the same tile/hour serialize instead of
+        overwriting each other. Returns number of hourly sketches touched.
+        """
+        by_key: Dict[SketchKey, set] = {}
+        for e in events:
+            key = sketch_key(e)
+            if key is not None:
+                by_key.setdefault(key, set()).add(e.sim_iccid)
+        return self._fold(by_key)
+
+    def _fold(self, by_key: Dict[SketchKey, set]) -> int:
+        for model in self.levels:
+            self._merge_into(model, _roll_up(by_key, BUCKETS[model]))
+        return len(by_key)
+
+    def _merge_into(self, model: type, sketches: Dict[SketchKey, Any], add=HyperLogLog.update) -> None:
+        """Apply ``add(sketch, value)`` to each keyed row of ``model``, creating missing rows.
+
+        Values are ICCID sets by default; pass ``add=HyperLogLog.merge_many``
+        for lists of register blobs.
+        """
+        if not sketches:
+            return
+        table = model.__table__
+        empty = HyperLogLog(DEFAULT_PRECISION).to_bytes()
+        stmt = upsert(self.session, table).on_conflict_do_nothing(
+            index_elements=[table.c.tile_lat, table.c.tile_lon, table.c.bucket_start]
+        )
+        self.session.execute(
+            stmt,
+            [
+                {"tile_lat": lat, "tile_lon": lon, "bucket_start": bucket, "registers": empty}
+                for lat, lon, bucket in sorted(sketches)
+            ],
+        )
+        existing = self._load(sketches, lock=True, model=model)
+        updates: List[dict] = []
+        for key, value in sketches.items():
+            row = existing[key]
+            hll = HyperLogLog(registers=row["registers"])
+            add(hll, value)
+            updates.append({"id": row["id"], "registers": hll.to_bytes()})
+        self.session.execute(update(model), updates)
+
+    def apply_where(self, where, chunk_size: int = 50_000) -> int:
+        """Add the ICCIDs of every located event matching ``where``.
+
+        Used for backfills and bulk loads. Hour buckets are computed and
+        duplicate (ICCID, hour, position) rows dropped in SQL; rows stream in
+        bucket order so consecutive chunks mostly touch disjoint hours and
+        each sketch is read and written about once. Caller commits. Returns
+        the number of distinct rows folded.
+        """
+        c = ConnectionEvent.__table__.c
+        bucket = floor_hour_sql(self.session, c.event_time)
+        stmt = (
+            select(c.sim_iccid, bucket, c.latitude, c.longitude)
+            .distinct()
+            .where(where, c.latitude.is_not(None), c.longitude.is_not(None), c.sim_iccid != "")
+            .order_by(bucket)
+        )
+        folded = 0
+        result = self.session.execute(stmt.execution_options(yield_per=chunk_size))
+        for part in result.partitions(chunk_size):
+            by_key: Dict[SketchKey, set] = {}
+            for iccid, hour, lat, lon in part:
+                by_key.setdefault((*tile_of(lat, lon), hour), set()).add(iccid)
+            self._fold(by_key)
+            folded += len(part)
+        return folded
+
+    def rebuild(self, keys: Iterable[SketchKey]) -> int:
+        """Recompute the given sketches from ``connectionevent``.
+
+        Sketches cannot subtract, so after a purge the affected tile/hours are
+        dropped and re-derived from the events that remain, and the daily
+        rollups they belong to are re-merged from their hourly sketches.
+        """
+        keys = set(keys)
+        if not keys:
+            return 0
+        days = {(lat, lon, floor_day(hour)) for lat, lon, hour in keys}
+        table = SimSketch.__table__
+        for model, stale_keys in ((SimSketch, keys), (SimSketchDay, days)):
+            stale = [row["id"] for row in self._load(stale_keys, model=model).values()]
+            if stale:
+                self.session.execute(delete(model.__table__).where(model.__table__.c.id.in_(stale)))
+        buckets = {k[2] for k in keys}
+        stmt = select(
+            ConnectionEvent.sim_iccid,
+            ConnectionEvent.event_time,
+            ConnectionEvent.latitude,
+            ConnectionEvent.longitude,
+        ).where(
+            ConnectionEvent.event_time >= min(buckets),
+            ConnectionEvent.event_time < max(buckets) + timedelta(hours=1),
+            ConnectionEvent.latitude.is_not(None),
+            ConnectionEvent.longitude.is_not(None),
+        )
+        hourly: Dict[SketchKey, set] = {}
+        for e in self.session.execute(stmt):
+            key = sketch_key(e)
+            if key in keys:
+                hourly.setdefault(key, set()).add(e.sim_iccid)
+        self._merge_into(SimSketch, hourly)
+
+        # Untouched hours of those days count too, so read the whole days back
+        starts = {d[2] for d in days}
+        stmt = select(table.c.tile_lat, table.c.tile_lon, table.c.bucket_start, table.c.registers).where(
+            table.c.tile_lat.in_({d[0] for d in days}),
+            table.c.bucket_start >= min(starts),
+            table.c.bucket_start < max(starts) + timedelta(days=1),
+        )
+        daily: Dict[SketchKey, List[bytes]] = {}
+        for lat, lon, hour, registers in self.session.execute(stmt):
+            key = (lat, lon, floor_day(hour))
+            if key in days:
+                daily.setdefault(key, []).append(registers)
+        self._merge_into(SimSketchDay, daily, add=HyperLogLog.merge_many)
+        return len(keys)
+
+    def estimate(
+        self,
+        min_lat: float = -90.0,
+        min_lon: float = -180.0,
+        max_lat: float = 90.0,
+        max_lon: float = 180.0,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Tuple[HyperLogLog, int]:
+        """Merge every sketch whose tile/hour overlaps the bbox and window.
+
+        The bbox is widened to whole tiles and the window to whole hours.
+        Whole UTC days inside the window are read from the daily rollup and
+        only the hours at either end from the hourly sketches. Returns the
+        merged sketch and the number of sketches merged.
+        """
+        lat_lo, lon_lo = tile_of(min_lat, min_lon)
+        lat_hi, lon_hi = tile_of(max_lat, max_lon)
+
+        def in_bbox(model):
+            return select(model.registers).where(
+                model.tile_lat >= lat_lo,
+                model.tile_lat <= lat_hi,
+                model.tile_lon >= lon_lo,
+                model.tile_lon <= lon_hi,
+            )
+
+        first_hour = floor_hour(start) if start else None
+        last_hour = floor_hour(end) if end else None
+        # First midnight at or after the start, first one after the end
+        first_day = floor_day(first_hour + timedelta(hours=23)) if first_hour is not None else None
+        end_day = floor_day(last_hour + timedelta(hours=1)) if last_hour is not None else None
+
+        queries = []
+        if first_day is not None and end_day is not None and first_day >= end_day:
+            queries.append(
+                in_bbox(SimSketch).where(
+                    SimSketch.bucket_start >= first_hour,
+                    SimSketch.bucket_start <= last_hour,
+                )
+            )
+        else:
+            days = in_bbox(SimSketchDay)
+            if first_day is not None:
+                days = days.where(SimSketchDay.bucket_start >= first_day)
+                queries.append(
+                    in_bbox(SimSketch).where(
+                        SimSketch.bucket_start >= first_hour,
+                        SimSketch.bucket_start < first_day,
+                    )
+                )
+            if end_day is not None:
+                days = days.where(SimSketchDay.bucket_start < end_day)
+                queries.append(
+                    in_bbox(SimSketch).where(
+                        SimSketch.bucket_start >= end_day,
+                        SimSketch.bucket_start <= last_hour,
+                    )
+                )
+            queries.append(days)
+        merged = HyperLogLog(DEFAULT_PRECISION)
+        count = sum(merged.merge_many(self.session.execute(q).scalars()) for q in queries)
+        return merged, count
+
+
+class DailySketchesRepository(SketchesRepository):
+    """Writes the daily rollup only.
+
+    Backfills ``simsketchday`` on databases whose hourly sketches predate it.
+    """
+
+    levels = (SimSketchDay,)
+
+
+def _roll_up(by_key: Dict[SketchKey, set], bucket: Callable[[datetime], datetime]) -> Dict[SketchKey, set]:
+    """Re-key hourly ICCID sets to ``bucket``, uniting those that land together."""
+    out: Dict[SketchKey, set] = {}
+    for (lat, lon, hour), iccids in by_key.items():
+        out.setdefault((lat, lon, bucket(hour)), set()).update(iccids)
+    return out
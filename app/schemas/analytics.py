@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List, Optional
+from typing_extensions import Literal
+
+from pydantic import BaseModel
+
+
+class UsageEntry(BaseModel):
+    sim_iccid: Optional[str] = None
+    sim_unique_name: Optional[str] = None
+    network_mcc: Optional[str] = None
+    network_mnc: Optional[str] = None
+    network_name: Optional[str] = None
+    data_total: int = 0
+    data_upload: int = 0
+    data_download: int = 0
+    sessions: int = 0
+
+
+class UsageResponse(BaseModel):
+    group_by: Literal["sim", "network"]
+    items: List[UsageEntry] = []
+
+
+class CellEntry(BaseModel):
+    network_mcc: str
+    network_mnc: str
+    lac: str
+    cell_id: str
+    started: int = 0
+    updated: int = 0
+    ended: int = 0
+    events: int = 0
+    data_total: int = 0
+    ended_per_hour: float = 0.0
+    last_seen: Optional[datetime] = None
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+
+
+class CellsResponse(BaseModel):
+    metric: Literal["ended", "started", "updated", "events", "bytes"]
+    hours: int
+    items: List[CellEntry] = []
+
+
+class DistinctSimsResponse(BaseModel):
+    estimate: int
+    relative_error: float
+    lower: int
+    upper: int
+    sketches: int
+    tile_degrees: float
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import List
+import json
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.models.connection_event import ConnectionEvent
 from app.schemas.heatmap import HeatmapPoint, HeatmapResponse
@@ -13,6 +14,24 @@ ONLINE_TYPES = {
 OFFLINE_TYPES = {"com.twilio.iot.supersim.connection.data-session.ended"}
 
 
+def heatmap_status(event_type: Optional[str]) -> str:
+    return "offline" if (event_type or "").lower() in OFFLINE_TYPES else "online"
+
+
+def heatmap_intensity(data_total: Optional[int]) -> float:
+    return max(1.0, float(data_total or 1) / 1024.0)
+
+
+def heatmap_items_json(points: List[Dict[str, Any]]) -> bytes:
+    """Encode ``HeatmapPoint``-shaped dicts as the comma-joined items of a JSON array.
+
+    Byte-for-byte what FastAPI renders for the model (``isoformat``
+    timestamps, compact separators), so slices encoded in pool workers can be
+    spliced into one response body without a model round trip.
+    """
+    return json.dumps(points, ensure_ascii=False, separators=(",", ":"))[1:-1].encode()
+
+
 class AnalyticsService:
     def build_heatmap(self, events: List[ConnectionEvent]) -> HeatmapResponse:
         online_points: List[HeatmapPoint] = []
@@ -21,12 +40,11 @@ class AnalyticsService:
         for e in events:
             if e.latitude is None or e.longitude is None:
                 continue
-            event_type = (e.event_type or "").lower()
-            status = "offline" if event_type in OFFLINE_TYPES else "online"
+            status = heatmap_status(e.event_type)
             point = HeatmapPoint(
                 lat=e.latitude,
                 lon=e.longitude,
-                intensity=max(1.0, float(e.data_total or 1) / 1024.0),
+                intensity=heatmap_intensity(e.data_total),
                 timestamp=e.event_time,
                 iccid=e.sim_iccid,
                 status=status,
@@ -34,3 +52,11 @@ class AnalyticsService:
             (offline_points if status == "offline" else online_points).append(point)
 
         return HeatmapResponse(online=online_points, offline=offline_points)
+
+    def merge_heatmap_partials(self, partials: List[Tuple[bytes, bytes]]) -> bytes:
+        """Splice per-slice ``(online, offline)`` JSON items, in order, into a
+        ``HeatmapResponse`` body.
+        """
+        online = b",".join(items for items, _ in partials if items)
+        offline = b",".join(items for _, items in partials if items)
+        return b'{"online":[' + online + b'],"offline":[' + offline + b"]}"
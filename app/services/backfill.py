@@ -0,0 +1,86 @@
+"""Fold events stored before an aggregate table existed into it.
+
+``init_db`` only records what is missing (see ``AggregateBackfill``), so the
+first boot after an upgrade stays fast. Run this once afterwards, alongside
+the app; each chunk commits together with its progress, so an interrupted
+run resumes where it stopped:
+
+    python -m app.services.backfill --chunk-size 50000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict
+
+from sqlalchemy import delete, select
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from app.models.aggregate_backfill import AggregateBackfill
+from app.models.connection_event import ConnectionEvent
+from app.repositories.cells_repo import CellsRepository
+from app.repositories.sessions_repo import SessionsRepository
+from app.repositories.sketches_repo import DailySketchesRepository, SketchesRepository
+
+
+AGGREGATES = {
+    "datasession": SessionsRepository,
+    "cellhourlystats": CellsRepository,
+    "simsketch": SketchesRepository,
+    "simsketchday": DailySketchesRepository,
+}
+
+
+def run(engine: Engine, chunk_size: int = 50_000) -> Dict[str, int]:
+    """Fold every pending backfill to completion. Returns events folded per aggregate."""
+    chunk_size = max(1, chunk_size)
+    folded: Dict[str, int] = {}
+    for name, repository in AGGREGATES.items():
+        while True:
+            with Session(engine) as session:
+                # Row lock on Postgres, so two runs cannot fold the same chunk
+                state = session.execute(
+                    select(AggregateBackfill)
+                    .where(AggregateBackfill.aggregate == name)
+                    .with_for_update()
+                ).scalar_one_or_none()
+                if state is None:
+                    break
+                lo = state.done_id + 1
+                hi = min(state.done_id + chunk_size, state.until_id)
+                if lo <= hi:
+                    repository(session).apply_where(ConnectionEvent.id.between(lo, hi))
+                    folded[name] = folded.get(name, 0) + hi - lo + 1
+                if hi >= state.until_id:
+                    session.execute(delete(AggregateBackfill).where(AggregateBackfill.aggregate == name))
+                else:
+                    state.done_id = hi
+                    session.add(state)
+                session.commit()
+    return folded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fold pre-existing events into new aggregate tables")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=50_000,
+        help="Event ids folded per transaction",
+    )
+    args = parser.parse_args()
+
+    from app.core.db import engine, init_db
+
+    init_db()
+    started = time.perf_counter()
+    folded = run(engine, args.chunk_size)
+    elapsed = time.perf_counter() - started
+    for name in AGGREGATES:
+        print(f"{name}: {folded.get(name, 0)} event ids folded")
+    print(f"done in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
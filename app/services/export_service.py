@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from sqlalchemy import DateTime, Float, Integer, select
+from sqlalchemy.engine import Engine
+
+from app.models.connection_event import ConnectionEvent
+from app.models.event_payload import EventPayload, decode_payload
+
+
+EXPORT_FORMATS = ("csv", "ndjson", "parquet")
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class _Drain(io.RawIOBase):
+    """Write-only sink whose buffered bytes are handed out and cleared."""
+
+    def __init__(self) -> None:
+        self._buf = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._buf.extend(b)
+        return len(b)
+
+    def take(self) -> bytes:
+        out = bytes(self._buf)
+        self._buf.clear()
+        return out
+
+
+class ExportService:
+    """Stream ``connectionevent`` rows out through a server-side cursor.
+
+    Rows are fetched ``chunk_size`` at a time and each chunk becomes one
+    CSV/NDJSON slice or one Parquet row group, so memory stays flat no matter
+    how large the window is. Raw payloads are joined in only when asked for.
+    """
+
+    def __init__(self, engine: Engine, chunk_size: int = 50_000) -> None:
+        self.engine = engine
+        self.chunk_size = max(1, chunk_size)
+
+    def columns(self) -> List:
+        return list(ConnectionEvent.__table__.columns)
+
+    def _chunks(
+        self,
+        columns: List,
+        include_payload: bool,
+        start: Optional[datetime],
+        end: Optional[datetime],
+    ) -> Iterator[list]:
+        stmt = select(*columns)
+        if include_payload:
+            stmt = stmt.add_columns(EventPayload.encoding, EventPayload.body).outerjoin(
+                EventPayload, EventPayload.event_id == ConnectionEvent.id
+            )
+        if start:
+            stmt = stmt.where(ConnectionEvent.event_time >= start)
+        if end:
+            stmt = stmt.where(ConnectionEvent.event_time <= end)
+        stmt = stmt.order_by(ConnectionEvent.event_time)
+        with self.engine.connect() as conn:
+            result = conn.execution_options(
+                stream_results=True, max_row_buffer=self.chunk_size
+            ).execute(stmt)
+            for part in result.partitions(self.chunk_size):
+                if include_payload:
+                    part = [
+                        (*row[:-2], decode_payload(row[-2], row[-1]) if row[-1] is not None else None)
+                        for row in part
+                    ]
+                yield part
+
+    def stream(
+        self,
+        fmt: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        include_payload: bool = False,
+    ) -> Iterator[bytes]:
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format '{fmt}'")
+        columns = self.columns()
+        if fmt == "parquet":
+            return self._parquet(columns, include_payload, start, end)
+        if fmt == "ndjson":
+            return self._ndjson(columns, include_payload, start, end)
+        return self._csv(columns, include_payload, start, end)
+
+    def _csv(self, columns, include_payload, start, end) -> Iterator[bytes]:
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(_names(columns, include_payload))
+        for rows in self._chunks(columns, include_payload, start, end):
+            writer.writerows([_csv_value(v) for v in row] for row in rows)
+            yield buf.getvalue().encode()
+            buf.seek(0)
+            buf.truncate()
+        tail = buf.getvalue()
+        if tail:
+            yield tail.encode()
+
+    def _ndjson(self, columns, include_payload, start, end) -> Iterator[bytes]:
+        names = _names(columns, include_payload)
+        for rows in self._chunks(columns, include_payload, start, end):
+            lines = [json.dumps(dict(zip(names, row)), default=_json_default) for row in rows]
+            yield ("\n".join(lines) + "\n").encode()
+
+    def _parquet(self, columns, include_payload, start, end) -> Iterator[bytes]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        fields = [(c.name, _arrow_type(pa, c)) for c in columns]
+        if include_payload:
+            fields.append(("payload", pa.string()))
+        schema = pa.schema(fields)
+        sink = _Drain()
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+        try:
+            for rows in self._chunks(columns, include_payload, start, end):
+                arrays = []
+                for i, field in enumerate(schema):
+                    values = [row[i] for row in rows]
+                    if field.name == "payload":
+                        values = [None if v is None else json.dumps(v) for v in values]
+                    arrays.append(pa.array(values, type=field.type))
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                data = sink.take()
+                if data:
+                    yield data
+        finally:
+            writer.close()
+        yield sink.take()
+
+
+def _names(columns, include_payload: bool) -> List[str]:
+    names = [c.name for c in columns]
+    if include_payload:
+        names.append("payload")
+    return names
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _arrow_type(pa, column):
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    return pa.string()
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return value
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,189 @@
+"""Partitioned, multi-process heatmap computation for large windows.
+
+The window is cut into equal time slices; each pool worker opens its own
+engine on ``DATABASE_URL``, reads one slice and returns it already encoded as
+JSON, so the parent only splices bytes in slice order and serialization scales
+with the workers too. A semaphore caps how many such
+heavy requests run at once so they cannot starve the webhook path; like the
+pool it is per server process, not shared between uvicorn workers. A pool
+that breaks (a worker killed mid-task) is replaced, and the request retried
+once on the new pool before falling back to reading the slices in-process.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from app.core.config import (
+    HEATMAP_HEAVY_WAIT,
+    HEATMAP_MAX_HEAVY,
+    HEATMAP_PARALLEL_MIN_DAYS,
+    HEATMAP_WORKERS,
+)
+from app.core.timeutil import naive_utc
+from app.models.connection_event import ConnectionEvent
+from app.services.analytics_service import heatmap_intensity, heatmap_items_json, heatmap_status
+
+
+# JSON items of one slice's (online, offline) points
+Partial = Tuple[bytes, bytes]
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_heavy_slots = threading.BoundedSemaphore(max(1, HEATMAP_MAX_HEAVY))
+
+# Per-process engines, so each worker keeps its own connection between tasks
+_engines: Dict[str, Engine] = {}
+
+
+class HeavyQueryBusy(RuntimeError):
+    """Raised when no heavy-query slot frees up within the wait budget."""
+
+
+@contextmanager
+def heavy_query_slot(timeout: float = HEATMAP_HEAVY_WAIT) -> Iterator[None]:
+    if not _heavy_slots.acquire(timeout=timeout):
+        raise HeavyQueryBusy("Too many heavy heatmap queries in flight")
+    try:
+        yield
+    finally:
+        _heavy_slots.release()
+
+
+def get_pool(workers: int = HEATMAP_WORKERS) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a threaded server process is not safe
+            _pool = ProcessPoolExecutor(
+                max_workers=max(1, workers),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+def discard_pool(pool: ProcessPoolExecutor) -> None:
+    """Forget a broken ``pool`` so the next ``get_pool`` starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        # Another request may already have replaced it
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def partition(start: datetime, end: datetime, parts: int) -> List[Tuple[datetime, datetime]]:
+    """Split ``[start, end]`` into ``parts`` contiguous, equal-width slices."""
+    parts = max(1, parts)
+    step = (end - start) / parts
+    bounds = [start + step * i for i in range(parts)] + [end]
+    return [(bounds[i], bounds[i + 1]) for i in range(parts) if bounds[i] < bounds[i + 1]] or [(start, end)]
+
+
+def heatmap_slice(database_url: str, start: datetime, end: datetime, inclusive_end: bool) -> Partial:
+    """Worker entry point: classify the events of one time slice."""
+    engine = _engines.get(database_url)
+    if engine is None:
+        engine = _engines[database_url] = create_engine(database_url)
+    c = ConnectionEvent
+    stmt = select(c.latitude, c.longitude, c.event_type, c.data_total, c.event_time, c.sim_iccid).where(
+        c.latitude.is_not(None),
+        c.longitude.is_not(None),
+        c.event_time >= start,
+        c.event_time <= end if inclusive_end else c.event_time < end,
+    )
+    online: List[Dict] = []
+    offline: List[Dict] = []
+    with engine.connect() as conn:
+        for lat, lon, event_type, data_total, ts, iccid in conn.execute(stmt):
+            status = heatmap_status(event_type)
+            (offline if status == "offline" else online).append(
+                {
+                    "lat": float(lat),
+                    "lon": float(lon),
+                    "intensity": heatmap_intensity(data_total),
+                    "timestamp": ts.isoformat(),
+                    "iccid": iccid,
+                    "status": status,
+                }
+            )
+    return heatmap_items_json(online), heatmap_items_json(offline)
+
+
+class ParallelHeatmap:
+    def __init__(
+        self,
+        database_url: str,
+        workers: int = HEATMAP_WORKERS,
+        min_days: float = HEATMAP_PARALLEL_MIN_DAYS,
+        pool: Optional[ProcessPoolExecutor] = None,
+    ) -> None:
+        self.database_url = database_url
+        self.workers = workers
+        self.min_span = timedelta(days=min_days)
+        self.pool = pool
+
+    def window(
+        self,
+        session: Session,
+        start: Optional[datetime],
+        end: Optional[datetime],
+    ) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """Fill open window bounds from the data (cheap on the event_time index)."""
+        if start is None or end is None:
+            lo, hi = session.execute(
+                select(func.min(ConnectionEvent.event_time), func.max(ConnectionEvent.event_time))
+            ).one()
+            start, end = start or lo, end or hi
+        return (
+            naive_utc(start) if start is not None else None,
+            naive_utc(end) if end is not None else None,
+        )
+
+    def eligible(self, start: Optional[datetime], end: Optional[datetime]) -> bool:
+        if self.workers < 1 or start is None or end is None:
+            return False
+        # Each worker needs to reach the same database on its own
+        if self.database_url.startswith("sqlite") and ":memory:" in self.database_url:
+            return False
+        return end - start >= self.min_span
+
+    def partials(self, start: datetime, end: datetime) -> List[Partial]:
+        # Twice as many slices as workers evens out skew between busy/quiet days
+        slices = partition(start, end, self.workers * 2)
+        if self.pool is not None:
+            return self._run(self.pool, slices)
+        for _ in range(2):
+            pool = get_pool(self.workers)
+            try:
+                return self._run(pool, slices)
+            except BrokenProcessPool:
+                discard_pool(pool)
+        return [
+            heatmap_slice(self.database_url, lo, hi, i == len(slices) - 1)
+            for i, (lo, hi) in enumerate(slices)
+        ]
+
+    def _run(self, pool: ProcessPoolExecutor, slices: List[Tuple[datetime, datetime]]) -> List[Partial]:
+        futures = [
+            pool.submit(heatmap_slice, self.database_url, lo, hi, i == len(slices) - 1)
+            for i, (lo, hi) in enumerate(slices)
+        ]
+        return [f.result() for f in futures]
@@ -0,0 +1,271 @@
+"""Bulk-load archived events straight into ``connectionevent``.
+
+Accepts NDJSON (raw Kore Super SIM events, or rows produced by ``/export``)
+and Parquet files written by ``/export``. Rows go in through a raw DBAPI
+``executemany`` in batches, skipping per-event HTTP and Pydantic validation.
+Payloads are compressed on a thread pool while SQLite works, and sessions,
+cell buckets and sketches are folded once, after the last batch, with
+set-based SQL rather than row by row. Each ``load`` is one transaction, so a
+bad row or a crash leaves nothing behind; on SQLite it holds the write lock
+throughout, and webhook writes wait for it.
+
+    python -m app.services.import_service archive.parquet more.ndjson
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from app.core.config import PAYLOAD_COMPRESSION
+from app.models.connection_event import ConnectionEvent
+from app.models.event_payload import encode_payload
+from app.repositories.events_repo import EventsRepository, id_ranges
+
+
+IMPORT_FORMATS = ("ndjson", "parquet")
+
+_TABLE = ConnectionEvent.__table__
+_COLUMNS = [c.name for c in _TABLE.columns if c.name != "id"]
+# Checked up front: the raw executemany would otherwise fail the whole batch
+# with an IntegrityError that names neither the row nor the column
+_REQUIRED = [c.name for c in _TABLE.columns if c.name != "id" and not c.nullable]
+
+
+def flatten_event(event: Dict) -> Dict:
+    """Map a raw Super SIM webhook event onto ``connectionevent`` columns."""
+    d = event.get("data") or {}
+    loc = d.get("location") or {}
+    net = d.get("network") or {}
+    return {
+        "event_sid": d.get("event_sid"),
+        "event_type": d.get("event_type"),
+        "event_time": d.get("timestamp"),
+        "source": event.get("source"),
+        "sim_iccid": d.get("sim_iccid"),
+        "sim_unique_name": d.get("sim_unique_name"),
+        "sim_sid": d.get("sim_sid"),
+        "fleet_sid": d.get("fleet_sid"),
+        "apn": d.get("apn"),
+        "imei": d.get("imei"),
+        "imsi": d.get("imsi"),
+        "rat_type": d.get("rat_type"),
+        "ip_address": d.get("ip_address"),
+        "account_sid": d.get("account_sid"),
+        "network_mcc": net.get("mcc"),
+        "network_mnc": net.get("mnc"),
+        "network_name": net.get("friendly_name"),
+        "network_iso_country": net.get("iso_country"),
+        "lac": loc.get("lac"),
+        "cell_id": loc.get("cell_id"),
+        "latitude": loc.get("lat"),
+        "longitude": loc.get("lon"),
+        "data_total": d.get("data_total"),
+        "data_upload": d.get("data_upload"),
+        "data_download": d.get("data_download"),
+        "data_session_sid": d.get("data_session_sid"),
+        "payload": event,
+    }
+
+
+def _normalize(row: Dict, line: int) -> Tuple[Dict, Optional[Any]]:
+    """Split an input row into ``connectionevent`` values and its payload.
+
+    ``line`` is the row's position in the input; NDJSON rows carry their own
+    line number, which wins. Raises ``ValueError`` naming it when a NOT NULL
+    column is missing or the timestamp is not ISO 8601.
+    """
+    line = row.pop(_LINE_NO, line)
+    raw = row.pop(_RAW_LINE, None)
+    if "data" in row and isinstance(row["data"], dict):
+        # flatten_event already yields exactly the table's columns
+        out = flatten_event(row)
+        payload = out.pop("payload")
+        if raw is not None:
+            payload = raw
+    else:
+        out = {name: row.get(name) for name in _COLUMNS}
+        payload = row.get("payload")
+    missing = [name for name in _REQUIRED if out[name] is None or out[name] == ""]
+    if missing:
+        raise ValueError(f"line {line}: missing required {', '.join(missing)}")
+    ts = out["event_time"]
+    if isinstance(ts, str):
+        try:
+            out["event_time"] = datetime.fromisoformat(ts)
+        except ValueError:
+            raise ValueError(f"line {line}: event_time {ts!r} is not an ISO 8601 timestamp")
+    elif not isinstance(ts, datetime):
+        raise ValueError(f"line {line}: event_time {ts!r} is not an ISO 8601 timestamp")
+    return out, payload
+
+
+# Key under which read_ndjson keeps the original line, so raw events can be
+# stored without a decode/encode round trip of the payload
+_RAW_LINE = "__raw__"
+_LINE_NO = "__line__"
+
+
+def read_ndjson(fh: IO[bytes]) -> Iterator[Dict]:
+    for number, line in enumerate(fh, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            raise ValueError(f"line {number}: invalid JSON ({exc})")
+        if not isinstance(row, dict):
+            raise ValueError(f"line {number}: expected a JSON object")
+        row[_RAW_LINE] = line.decode() if isinstance(line, bytes) else line
+        row[_LINE_NO] = number
+        yield row
+
+
+def read_parquet(source, batch_size: int = 50_000) -> Iterator[Dict]:
+    import pyarrow.parquet as pq
+
+    pf = pq.ParquetFile(source)
+    for batch in pf.iter_batches(batch_size=batch_size):
+        yield from batch.to_pylist()
+
+
+class BulkImporter:
+    def __init__(
+        self,
+        engine: Engine,
+        batch_size: int = 50_000,
+        compression: str = PAYLOAD_COMPRESSION,
+    ) -> None:
+        self.engine = engine
+        self.batch_size = max(1, batch_size)
+        self.compression = compression
+
+    def load(self, rows: Iterable[Dict]) -> int:
+        """Insert rows in batches of ``batch_size``, then fold the aggregates
+        and commit once. Returns rows stored.
+        """
+        stored = 0
+        ranges: List[Tuple[int, int]] = []
+        batch: List[Tuple[Dict, Optional[Any]]] = []
+        # zlib releases the GIL, so payloads compress on other cores while
+        # the main thread parses and SQLite inserts
+        with ThreadPoolExecutor(max_workers=_ENCODE_THREADS) as pool, Session(self.engine) as session:
+            repo = EventsRepository(session)
+            with _sqlite_cache(session):
+                for number, row in enumerate(rows, 1):
+                    batch.append(_normalize(row, number))
+                    if len(batch) >= self.batch_size:
+                        stored += self._flush(repo, batch, pool, ranges)
+                        batch = []
+                if batch:
+                    stored += self._flush(repo, batch, pool, ranges)
+                repo.fold_aggregates(ranges)
+            session.commit()
+        return stored
+
+    def load_file(self, source, fmt: Optional[str] = None) -> int:
+        fmt = fmt or _guess_format(str(source))
+        if fmt == "parquet":
+            return self.load(read_parquet(source, self.batch_size))
+        if fmt == "ndjson":
+            if hasattr(source, "read"):
+                return self.load(read_ndjson(source))
+            with open(source, "rb") as fh:
+                return self.load(read_ndjson(fh))
+        raise ValueError(f"Unsupported import format '{fmt}'")
+
+    def _flush(
+        self,
+        repo: EventsRepository,
+        batch: List[Tuple[Dict, Optional[Any]]],
+        pool: ThreadPoolExecutor,
+        ranges: List[Tuple[int, int]],
+    ) -> int:
+        payloads = [payload for _, payload in batch]
+        step = -(-len(payloads) // _ENCODE_THREADS)
+        encoding = [
+            pool.submit(_encode_all, payloads[i : i + step], self.compression)
+            for i in range(0, len(payloads), step)
+        ]
+        ids = repo.insert_rows([row for row, _ in batch])
+        repo.insert_payloads(ids, [blob for f in encoding for blob in f.result()])
+        id_ranges(ids, ranges)
+        return len(batch)
+
+
+_ENCODE_THREADS = os.cpu_count() or 1
+
+# Page cache for the importer's own connection while it loads; set and
+# restored per load so pooled app connections keep SQLite's small default
+_IMPORT_CACHE_KIB = 128 * 1024
+
+
+@contextmanager
+def _sqlite_cache(session: Session) -> Iterator[None]:
+    if session.get_bind().dialect.name != "sqlite":
+        yield
+        return
+    conn = session.connection()
+    previous = conn.exec_driver_sql("PRAGMA cache_size").scalar()
+    conn.exec_driver_sql(f"PRAGMA cache_size=-{_IMPORT_CACHE_KIB}")
+    try:
+        yield
+    finally:
+        conn.exec_driver_sql(f"PRAGMA cache_size={previous}")
+
+
+def _encode_all(payloads: List[Optional[Any]], compression: str) -> List[Optional[Tuple[str, bytes]]]:
+    return [None if p is None else encode_payload(p, compression) for p in payloads]
+
+
+def _guess_format(name: str) -> str:
+    if name.endswith(".parquet"):
+        return "parquet"
+    return "ndjson"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk import archived Super SIM events")
+    parser.add_argument("paths", nargs="+", help="NDJSON or Parquet files to load")
+    parser.add_argument(
+        "--format",
+        choices=IMPORT_FORMATS,
+        help="Input format (default: inferred from the file extension)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=50_000,
+        help="Rows per insert transaction",
+    )
+    parser.add_argument(
+        "--compression",
+        choices=("zlib", "none"),
+        default=PAYLOAD_COMPRESSION,
+        help="Payload compression (default: PAYLOAD_COMPRESSION)",
+    )
+    args = parser.parse_args()
+
+    from app.core.db import engine, init_db
+
+    init_db()
+    importer = BulkImporter(engine, batch_size=args.batch_size, compression=args.compression)
+    for path in args.paths:
+        started = time.perf_counter()
+        stored = importer.load_file(path, args.format)
+        elapsed = time.perf_counter() - started
+        rate = stored / elapsed if elapsed else float("inf")
+        print(f"{path}: {stored} rows in {elapsed:.2f}s ({rate:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
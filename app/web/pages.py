@@ -3,6 +3,7 @@ from fastapi.responses import HTMLResponse, PlainTextResponse
 from fastapi.templating import Jinja2Templates
 from sqlmodel import Session
 
+from app.core.config import DEMO_ENABLED
 from app.core.db import get_session
 from app.repositories.events_repo import EventsRepository
 
@@ -13,9 +14,12 @@ router = APIRouter(tags=["pages"])
 
 @router.get("/", response_class=HTMLResponse)
 def index(request: Request, session: Session = Depends(get_session)) -> HTMLResponse:
-    # As requested, refreshing the page should delete demo data
-    EventsRepository(session).purge_by_source("demo-seeder")
-    return templates.TemplateResponse("index.html", {"request": request})
+    if DEMO_ENABLED:
+        # As requested, refreshing the page should delete demo data
+        EventsRepository(session).purge_by_source("demo-seeder")
+    return templates.TemplateResponse(
+        "index.html", {"request": request, "demo_enabled": DEMO_ENABLED}
+    )
 
 
 @router.get("/health", response_class=PlainTextResponse)
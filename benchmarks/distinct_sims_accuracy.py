@@ -0,0 +1,106 @@
+"""Compare /analytics/distinct-sims sketch estimates against exact counts.
+
+Seeds sessions with ``seed_events.py`` helpers (a separate device pool per
+region, so regions overlap in ICCIDs the way the seeder's own runs do),
+ingests them through the webhook in-process, then checks each region's bbox
+and the whole world against ``COUNT(DISTINCT sim_iccid)``. Exits non-zero if
+any exact count falls outside the reported ±3σ bounds. The small seeded variant
+runs under pytest in ``tests/test_distinct_sims.py``. Run from the repo root:
+
+    python benchmarks/distinct_sims_accuracy.py --devices 2000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def seed(devices: int, sessions_per_device: int) -> List[Dict]:
+    from app.demo.utils.seed_events import REGIONS, build_session, generate_device_profiles
+
+    day_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    events: List[Dict] = []
+    for offset, region in enumerate(REGIONS):
+        # Shift the pool per region so only part of the ICCIDs repeat
+        profiles = generate_device_profiles(devices + offset * devices // 4)[offset * devices // 4 :]
+        for profile in profiles:
+            for _ in range(sessions_per_device):
+                events.extend(
+                    build_session(
+                        region,
+                        device_name=profile["name"],
+                        iccid=profile["iccid"],
+                        sim_sid=profile["sim_sid"],
+                        imei=profile["imei"],
+                        imsi=profile["imsi"],
+                        day_start=day_start,
+                    )
+                )
+    return events
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check HyperLogLog distinct-SIM accuracy")
+    parser.add_argument("--devices", type=int, default=2000, help="Devices per region")
+    parser.add_argument("--sessions-per-device", type=int, default=1)
+    parser.add_argument("--seed", type=int, help="Seed the generator for a repeatable run")
+    args = parser.parse_args()
+
+    db_path = Path(tempfile.mkdtemp()) / "distinct.db"
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.chdir(ROOT)
+    sys.path.insert(0, str(ROOT))
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import func, select
+    from sqlmodel import Session
+    from app.core.db import engine
+    from app.demo.utils.seed_events import REGIONS
+    from app.main import app
+    from app.models.connection_event import ConnectionEvent
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    events = seed(args.devices, args.sessions_per_device)
+    world = ((-90.0, 90.0), (-180.0, 180.0))
+    failures = 0
+    with TestClient(app) as client:
+        for i in range(0, len(events), 500):
+            client.post("/webhooks/supersim", json=events[i : i + 500]).raise_for_status()
+
+        print(f"{'bbox':<10} {'exact':>7} {'estimate':>9} {'error':>7} {'bound(3se)':>11} {'ms':>6}")
+        for name, ((lat_lo, lat_hi), (lon_lo, lon_hi)) in [*REGIONS.items(), ("world", world)]:
+            with Session(engine) as session:
+                exact = session.execute(
+                    select(func.count(func.distinct(ConnectionEvent.sim_iccid))).where(
+                        ConnectionEvent.latitude.between(lat_lo, lat_hi),
+                        ConnectionEvent.longitude.between(lon_lo, lon_hi),
+                    )
+                ).scalar_one()
+            started = time.perf_counter()
+            body = client.get(
+                "/analytics/distinct-sims",
+                params={"min_lat": lat_lo, "max_lat": lat_hi, "min_lon": lon_lo, "max_lon": lon_hi},
+            ).json()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            error = (body["estimate"] - exact) / exact if exact else 0.0
+            bound = 3 * body["relative_error"]
+            if not body["lower"] <= exact <= body["upper"]:
+                failures += 1
+            print(f"{name:<10} {exact:>7} {body['estimate']:>9} {error:>+7.2%} {bound:>11.2%} {elapsed_ms:>6.1f}")
+
+    if failures:
+        sys.exit(f"{failures} estimate(s) outside the reported ±3σ bounds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Measure multi-process heatmap speedup against worker count.
+
+Builds (or reuses) a SQLite database of synthetic events spread over a
+90-day window, then times ``GET /heatmap`` end to end (query, encoding and
+response body) with ``HEATMAP_WORKERS=0`` (the serial path) and 1, 2, 4, ...
+workers up to the CPU count, each in a fresh interpreter. ``partials()``
+alone is timed too, to show how much of a request the parent still spends
+outside the pool. Run from the repo root:
+
+    python benchmarks/heatmap_parallel_bench.py --rows 10000000 --db /tmp/heatmap.db
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+EVENT_TYPES = [
+    "com.twilio.iot.supersim.connection.data-session.started",
+    "com.twilio.iot.supersim.connection.data-session.updated",
+    "com.twilio.iot.supersim.connection.data-session.ended",
+]
+
+
+def build_db(path: Path, rows: int, days: int) -> None:
+    from sqlmodel import SQLModel, create_engine
+    from app.main import app  # noqa: F401  (registers every model)
+
+    SQLModel.metadata.create_all(create_engine(f"sqlite:///{path}"))
+    start = datetime(2025, 1, 1)
+    span = days * 86400
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    chunk = 200_000
+    for offset in range(0, rows, chunk):
+        batch = []
+        for i in range(offset, min(rows, offset + chunk)):
+            ts = start + timedelta(seconds=random.randrange(span))
+            batch.append(
+                (
+                    f"EZ{i}",
+                    random.choice(EVENT_TYPES),
+                    ts.strftime("%Y-%m-%d %H:%M:%S.%f"),
+                    str(898830790353775161300 + i % 5000),
+                    random.uniform(-60, 60),
+                    random.uniform(-180, 180),
+                    random.randint(500, 50_000),
+                )
+            )
+        conn.executemany(
+            "INSERT INTO connectionevent (event_sid, event_type, event_time, sim_iccid,"
+            " latitude, longitude, data_total) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            batch,
+        )
+        conn.commit()
+        print(f"  seeded {min(rows, offset + chunk):,} rows", end="\r", flush=True)
+    conn.close()
+    print()
+
+
+def measure(days: int) -> None:
+    """Child process: time one warm ``GET /heatmap`` over the whole window."""
+    from fastapi.testclient import TestClient
+    from app.core.config import HEATMAP_WORKERS
+    from app.main import app
+
+    start = datetime(2025, 1, 1)
+    end = start + timedelta(days=days)
+    params = {"start_time": start.isoformat(), "end_time": end.isoformat()}
+    result = {}
+    with TestClient(app) as client:
+        client.get("/heatmap", params=params).raise_for_status()  # spawn and warm the workers up
+        started = time.perf_counter()
+        response = client.get("/heatmap", params=params)
+        response.raise_for_status()
+        result["endpoint"] = time.perf_counter() - started
+        result["bytes"] = len(response.content)
+        if HEATMAP_WORKERS > 0:
+            from app.core.db import DATABASE_URL
+            from app.services.heatmap_parallel import ParallelHeatmap
+
+            started = time.perf_counter()
+            ParallelHeatmap(DATABASE_URL).partials(start, end)
+            result["partials"] = time.perf_counter() - started
+    print(json.dumps(result))
+
+
+def run(db: Path, days: int, workers: int) -> dict:
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{db}", "HEATMAP_WORKERS": str(workers)}
+    proc = subprocess.run(
+        [sys.executable, __file__, "--db", str(db), "--days", str(days), "--child"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark parallel heatmap speedup")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="Events to seed")
+    parser.add_argument("--days", type=int, default=90, help="Window the events span")
+    parser.add_argument("--db", type=Path, default=Path("/tmp/heatmap_bench.db"))
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure(args.days)
+        return
+
+    if not args.db.exists():
+        print(f"building {args.db} with {args.rows:,} rows")
+        build_db(args.db, args.rows, args.days)
+
+    serial = run(args.db, args.days, 0)
+    print(f"cpus: {os.cpu_count()}  body: {serial['bytes'] / 1e6:,.1f} MB")
+    print(f"serial:      GET /heatmap {serial['endpoint']:6.2f}s")
+
+    workers = 1
+    while workers <= args.max_workers:
+        result = run(args.db, args.days, workers)
+        print(
+            f"workers={workers:<3} GET /heatmap {result['endpoint']:6.2f}s"
+            f"  speedup x{serial['endpoint'] / result['endpoint']:.2f}"
+            f"  (partials {result['partials']:.2f}s)"
+        )
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Measure webhook ingest throughput and on-disk size per stored event.
+
+Runs the FastAPI app in-process against a throwaway SQLite file, posts
+seeded start/update/end sessions in webhook-sized batches, then reports
+events/s and database bytes per event. Run from the repo root:
+
+    python benchmarks/ingest_bench.py --events 30000 --batch-size 100
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def build_events(count: int) -> List[Dict]:
+    from app.demo.utils.seed_events import REGIONS, build_session, generate_device_profiles
+
+    day_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    regions = list(REGIONS)
+    profiles = generate_device_profiles(50)
+    events: List[Dict] = []
+    idx = 0
+    while len(events) < count:
+        profile = profiles[idx % len(profiles)]
+        events.extend(
+            build_session(
+                regions[idx % len(regions)],
+                device_name=profile["name"],
+                iccid=profile["iccid"],
+                sim_sid=profile["sim_sid"],
+                imei=profile["imei"],
+                imsi=profile["imsi"],
+                day_start=day_start,
+            )
+        )
+        idx += 1
+    return events[:count]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark webhook ingest and DB size")
+    parser.add_argument("--events", type=int, default=30_000, help="Events to ingest")
+    parser.add_argument("--batch-size", type=int, default=100, help="Events per webhook POST")
+    args = parser.parse_args()
+
+    db_path = Path(tempfile.mkdtemp()) / "bench.db"
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.chdir(ROOT)
+    sys.path.insert(0, str(ROOT))
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    events = build_events(args.events)
+    with TestClient(app) as client:
+        started = time.perf_counter()
+        for i in range(0, len(events), args.batch_size):
+            response = client.post("/webhooks/supersim", json=events[i : i + args.batch_size])
+            response.raise_for_status()
+        elapsed = time.perf_counter() - started
+
+    size = db_path.stat().st_size
+    print(f"events:        {len(events)}")
+    print(f"ingest:        {len(events) / elapsed:,.0f} events/s ({elapsed:.2f}s)")
+    print(f"db size:       {size / 1e6:.1f} MB ({size / len(events):,.0f} bytes/event)")
+
+
+if __name__ == "__main__":
+    main()
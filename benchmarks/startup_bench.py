@@ -0,0 +1,107 @@
+"""Measure cold-start cost: import graph and time to first 200 on /health.
+
+Prints the slowest modules from ``python -X importtime -c "import app.main"``
+and then boots uvicorn twice against a throwaway SQLite file: once on an
+empty database (schema gets created) and once on the now-current schema
+(schema step skipped). Run from the repo root:
+
+    python benchmarks/startup_bench.py --max-seconds 5
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def import_breakdown(env: Dict[str, str]) -> Tuple[int, List[Tuple[int, str]]]:
+    """Return total microseconds and (cumulative_us, module) for app.main."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows: List[Tuple[int, str]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time:   self |   cumulative |   <indent>module"
+        _, cumulative_us, name = line.split(":", 1)[1].split("|")
+        rows.append((int(cumulative_us), name.strip()))
+    total = next((us for us, name in rows if name == "app.main"), 0)
+    return total, rows
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_200(env: Dict[str, str], timeout: float = 30.0) -> float:
+    port = free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        env=env,
+    )
+    try:
+        url = f"http://127.0.0.1:{port}/health"
+        while time.perf_counter() - started < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {proc.returncode}")
+            try:
+                if httpx.get(url, timeout=0.5).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.TransportError:
+                pass
+            time.sleep(0.01)
+        raise RuntimeError(f"/health did not return 200 within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark app import and time-to-first-200")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list")
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        help="Exit non-zero if the warm boot takes longer than this",
+    )
+    args = parser.parse_args()
+
+    db_path = Path(tempfile.mkdtemp()) / "startup.db"
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{db_path}"}
+
+    total, rows = import_breakdown(env)
+    print(f"import app.main: {total / 1000:.0f} ms")
+    for us, name in sorted(rows, reverse=True)[: args.top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    cold = time_to_first_200(env)
+    warm = time_to_first_200(env)
+    print(f"first 200 /health, empty DB:   {cold:.2f}s")
+    print(f"first 200 /health, current DB: {warm:.2f}s")
+
+    if args.max_seconds is not None and warm > args.max_seconds:
+        sys.exit(f"warm boot {warm:.2f}s exceeds budget of {args.max_seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Shared fixtures: one throwaway SQLite database for the whole run.
+
+``app.core.db`` reads ``DATABASE_URL`` once, at import, so the variable is
+set before the app is first imported and the engine's URL is checked
+afterwards; a stray earlier import would otherwise send writes to
+``./events.db``.
+"""
+from __future__ import annotations
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def client(tmp_path_factory):
+    url = f"sqlite:///{tmp_path_factory.mktemp('db') / 'test.db'}"
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("DATABASE_URL", url)
+        from fastapi.testclient import TestClient
+        from app.core import db
+        from app.main import app
+
+        assert db.DATABASE_URL == url, f"app.core.db was imported before the test DB was set: {db.DATABASE_URL}"
+        with TestClient(app) as c:
+            yield c
+
+
+@pytest.fixture(scope="session")
+def wipe(client):
+    """Callable deleting every row, so each test starts from an empty DB."""
+    from sqlmodel import SQLModel
+    from app.core.db import engine
+
+    def _wipe() -> None:
+        with engine.begin() as conn:
+            for table in reversed(SQLModel.metadata.sorted_tables):
+                if table.name != "schemaversion":
+                    conn.execute(table.delete())
+
+    return _wipe
@@ -0,0 +1,72 @@
+"""``POST /import`` rejects malformed archives with a 400 naming the line."""
+from __future__ import annotations
+
+import copy
+import json
+import random
+from datetime import datetime
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def events():
+    from app.demo.utils.seed_events import build_session, generate_device_profiles
+
+    random.seed(5)
+    profile = generate_device_profiles(1)[0]
+    return build_session(
+        "lisbon",
+        device_name=profile["name"],
+        iccid=profile["iccid"],
+        sim_sid=profile["sim_sid"],
+        imei=profile["imei"],
+        imsi=profile["imsi"],
+        day_start=datetime(2025, 1, 1),
+    )
+
+
+def ndjson(rows) -> bytes:
+    return b"\n".join(r if isinstance(r, bytes) else json.dumps(r).encode() for r in rows)
+
+
+def stored(client) -> int:
+    from sqlalchemy import text
+    from app.core.db import engine
+
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT COUNT(*) FROM connectionevent")).scalar_one()
+
+
+def without(event: dict, field: str) -> dict:
+    event = copy.deepcopy(event)
+    del event["data"][field]
+    return event
+
+
+@pytest.mark.parametrize(
+    "bad, message",
+    [
+        (lambda e: without(e, "sim_iccid"), "line 2: missing required sim_iccid"),
+        (lambda e: without(e, "timestamp"), "line 2: missing required event_time"),
+        (lambda e: {"data": 5}, "line 2: missing required event_sid, event_type, event_time, sim_iccid"),
+        (lambda e: b"{not json", "line 2: invalid JSON"),
+        (lambda e: b"[1, 2]", "line 2: expected a JSON object"),
+    ],
+)
+def test_bad_rows_are_a_400_naming_the_line(client, wipe, events, bad, message):
+    wipe()
+    response = client.post("/import", content=ndjson([events[0], bad(events[1])]))
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith(message)
+    assert stored(client) == 0
+
+
+def test_driver_errors_are_a_400(client, wipe, events):
+    wipe()
+    event = copy.deepcopy(events[0])
+    event["data"]["location"]["lat"] = {"deg": 38.7}
+    response = client.post("/import", content=ndjson([event]))
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("TypeError: latitude:")
+    assert stored(client) == 0
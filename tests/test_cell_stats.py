@@ -0,0 +1,65 @@
+"""``/analytics/cells`` rates over the hourly cell buckets."""
+from __future__ import annotations
+
+import copy
+import itertools
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+DAY_START = datetime(2025, 1, 1)
+_sids = itertools.count()
+
+
+@pytest.fixture(scope="module")
+def template():
+    from app.demo.utils.seed_events import build_session, generate_device_profiles
+
+    random.seed(99)
+    profile = generate_device_profiles(1)[0]
+    return build_session(
+        "naples",
+        device_name=profile["name"],
+        iccid=profile["iccid"],
+        sim_sid=profile["sim_sid"],
+        imei=profile["imei"],
+        imsi=profile["imsi"],
+        day_start=DAY_START,
+    )[0]
+
+
+def cell_event(template, cell_id: str, ts: datetime, kind: str) -> dict:
+    event = copy.deepcopy(template)
+    data = event["data"]
+    data["location"].update(cell_id=cell_id, lac="100")
+    data["event_type"] = event["type"] = f"com.twilio.iot.supersim.connection.data-session.{kind}"
+    data["timestamp"] = event["time"] = ts.isoformat()
+    data["event_sid"] = event["id"] = f"EZcell{next(_sids)}"
+    return event
+
+
+def test_open_window_hours_do_not_depend_on_limit(client, wipe, template):
+    wipe()
+    last_hour = DAY_START + timedelta(hours=46)
+    # One cell drops 30 sessions in the last hour; a quieter one spans 47 hours
+    events = [cell_event(template, "1001", last_hour + timedelta(minutes=i), "ended") for i in range(30)]
+    events += [
+        cell_event(template, "2002", DAY_START, "ended"),
+        cell_event(template, "2002", last_hour, "started"),
+    ]
+    client.post("/webhooks/supersim", json=events).raise_for_status()
+
+    for limit in (1, 2):
+        body = client.get("/analytics/cells", params={"limit": limit}).json()
+        assert body["hours"] == 47, limit
+        top = body["items"][0]
+        assert top["cell_id"] == "1001"
+        assert top["ended_per_hour"] == pytest.approx(30 / 47)
+
+    bounded = client.get(
+        "/analytics/cells",
+        params={"start_time": last_hour.isoformat(), "end_time": last_hour.isoformat()},
+    ).json()
+    assert bounded["hours"] == 1
+    assert bounded["items"][0]["ended_per_hour"] == pytest.approx(30.0)
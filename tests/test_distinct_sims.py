@@ -0,0 +1,144 @@
+"""Sketch estimates from /analytics/distinct-sims against exact counts.
+
+Small, seeded version of ``benchmarks/distinct_sims_accuracy.py``: a few
+hundred devices per region built with the ``seed_events.py`` helpers, so
+the estimates are the same on every run. Run from the repo root:
+
+    python -m pytest -q tests
+"""
+from __future__ import annotations
+
+import random
+from datetime import datetime
+
+import pytest
+
+DEVICES = 300
+WORLD = ((-90.0, 90.0), (-180.0, 180.0))
+
+
+@pytest.fixture(scope="module")
+def seeded(client, wipe):
+    from app.demo.utils.seed_events import REGIONS, build_session, generate_device_profiles
+
+    wipe()
+    random.seed(1234)
+    day_start = datetime(2025, 1, 1)
+    events = []
+    for offset, region in enumerate(REGIONS):
+        # Shift the pool per region so only part of the ICCIDs repeat
+        shift = offset * DEVICES // 4
+        for profile in generate_device_profiles(DEVICES + shift)[shift:]:
+            events.extend(
+                build_session(
+                    region,
+                    device_name=profile["name"],
+                    iccid=profile["iccid"],
+                    sim_sid=profile["sim_sid"],
+                    imei=profile["imei"],
+                    imsi=profile["imsi"],
+                    day_start=day_start,
+                )
+            )
+    for i in range(0, len(events), 500):
+        client.post("/webhooks/supersim", json=events[i : i + 500]).raise_for_status()
+    return REGIONS
+
+
+def exact_count(bbox) -> int:
+    from sqlalchemy import func, select
+    from sqlmodel import Session
+    from app.core.db import engine
+    from app.models.connection_event import ConnectionEvent
+
+    (lat_lo, lat_hi), (lon_lo, lon_hi) = bbox
+    with Session(engine) as session:
+        return session.execute(
+            select(func.count(func.distinct(ConnectionEvent.sim_iccid))).where(
+                ConnectionEvent.latitude.between(lat_lo, lat_hi),
+                ConnectionEvent.longitude.between(lon_lo, lon_hi),
+            )
+        ).scalar_one()
+
+
+def test_bounds_contain_exact_count(client, seeded):
+    bboxes = {**seeded, "world": WORLD}
+    for name, ((lat_lo, lat_hi), (lon_lo, lon_hi)) in bboxes.items():
+        exact = exact_count(((lat_lo, lat_hi), (lon_lo, lon_hi)))
+        body = client.get(
+            "/analytics/distinct-sims",
+            params={"min_lat": lat_lo, "max_lat": lat_hi, "min_lon": lon_lo, "max_lon": lon_hi},
+        ).json()
+        assert exact > 0, name
+        # The reported bounds are the promise; the test holds them to it
+        assert body["lower"] <= exact <= body["upper"], (name, exact, body)
+        margin = 3 * body["relative_error"] * body["estimate"]
+        assert body["upper"] - body["lower"] <= 2 * margin + 2, (name, body)
+
+
+def hourly_only(session, first_hour=None, last_hour=None) -> bytes:
+    from sqlalchemy import select
+    from app.models.sim_sketch import SimSketch
+    from app.services.hyperloglog import HyperLogLog
+
+    stmt = select(SimSketch.registers)
+    if first_hour is not None:
+        stmt = stmt.where(SimSketch.bucket_start >= first_hour)
+    if last_hour is not None:
+        stmt = stmt.where(SimSketch.bucket_start <= last_hour)
+    merged = HyperLogLog()
+    merged.merge_many(session.execute(stmt).scalars())
+    return merged.to_bytes()
+
+
+def test_daily_rollup_matches_hourly_sketches(client, wipe):
+    from datetime import timedelta
+    from sqlalchemy import select
+    from sqlmodel import Session
+    from app.core.db import engine
+    from app.demo.utils.seed_events import build_session, generate_device_profiles
+    from app.models.sim_sketch_day import SimSketchDay
+    from app.repositories.events_repo import EventsRepository
+    from app.repositories.sketches_repo import SketchesRepository
+
+    wipe()
+    random.seed(77)
+    day0 = datetime(2025, 1, 1)
+    events = []
+    for n, profile in enumerate(generate_device_profiles(120)):
+        for event in build_session(
+            "lisbon",
+            device_name=profile["name"],
+            iccid=profile["iccid"],
+            sim_sid=profile["sim_sid"],
+            imei=profile["imei"],
+            imsi=profile["imsi"],
+            day_start=day0 + timedelta(days=n % 3),
+        ):
+            event["source"] = "demo-seeder" if n % 5 == 0 else "kore-events"
+            events.append(event)
+    client.post("/webhooks/supersim", json=events).raise_for_status()
+
+    windows = [
+        (None, None),
+        (day0 + timedelta(hours=5), day0 + timedelta(days=2, hours=7)),
+        (day0 + timedelta(hours=3), day0 + timedelta(hours=9)),
+        (day0 + timedelta(days=1), day0 + timedelta(days=1, hours=23)),
+        (day0 + timedelta(hours=20), day0 + timedelta(days=1, hours=2)),
+        (None, day0 + timedelta(days=1, hours=12)),
+        (day0 + timedelta(days=1, minutes=30), None),
+    ]
+
+    def check():
+        with Session(engine) as session:
+            assert session.execute(select(SimSketchDay)).first() is not None
+            for start, end in windows:
+                merged, _ = SketchesRepository(session).estimate(start=start, end=end)
+                first = start.replace(minute=0) if start else None
+                last = end.replace(minute=0) if end else None
+                assert merged.to_bytes() == hourly_only(session, first, last), (start, end)
+
+    check()
+    with Session(engine) as session:
+        assert EventsRepository(session).purge_by_source("demo-seeder") > 0
+    check()